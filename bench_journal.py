@@ -0,0 +1,91 @@
+"""변경 1건당 저장 지연 벤치마크
+
+저널 도입 전 save_trades(전체 목록을 indent=2 JSON으로 다시 쓰고 fsync + 백업 복사/정리)와
+현재 TradeJournal.write(로그에 레코드 한 줄 추가 + fsync)를 거래 N개 상태에서 비교한다.
+임시 디렉토리에서 실행하므로 data/는 건드리지 않는다.
+
+    python bench_journal.py --counts 100 10000 100000
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+from bench_trades import legacy_trades
+from storage import TradeJournal
+from trade import decode_trade
+
+
+def save_trades(data_file, data):
+    """저널 도입 전 bot.save_trades와 같은 동작"""
+    dir_name = os.path.dirname(data_file)
+    fd, tmp_path = tempfile.mkstemp(dir=dir_name, suffix=".tmp", prefix="trades_")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(data_file):
+            backup_dir = os.path.join(dir_name, "backups")
+            os.makedirs(backup_dir, exist_ok=True)
+            backup_name = f"trades_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.json"
+            shutil.copy2(data_file, os.path.join(backup_dir, backup_name))
+            backups = sorted(
+                [os.path.join(backup_dir, f) for f in os.listdir(backup_dir) if f.endswith('.json')],
+                key=os.path.getmtime
+            )
+            while len(backups) > 3:
+                os.unlink(backups.pop(0))
+        os.replace(tmp_path, data_file)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def timed(func, repeat):
+    """func를 repeat번 실행한 소요 시간(ms)의 중앙값"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def bench(count, rng, repeat):
+    trades = legacy_trades(count, rng)
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, "trades.json")
+        save_trades(data_file, trades)  # 백업 경로까지 타도록 기존 파일을 만들어 둠
+        legacy = timed(lambda: save_trades(data_file, trades), max(1, min(repeat, 1_000_000 // count)))
+
+        journal = TradeJournal(os.path.join(tmp, "journal", "trades.json"))
+        row = decode_trade(trades[0]).to_row()
+        journal.write([{"op": "add", "trade": row, "seq": journal.next_seq()}])  # 로그 파일 열기
+        append = timed(lambda: journal.write([{"op": "add", "trade": row, "seq": journal.next_seq()}]), repeat)
+        journal.close()
+    return legacy, append
+
+
+def main():
+    parser = argparse.ArgumentParser(description="변경 1건당 저장 지연 벤치마크")
+    parser.add_argument("--counts", type=int, nargs="+", default=[100, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'거래 수':>10}{'save_trades (ms)':>20}{'저널 추가 (ms)':>18}{'배율':>10}")
+    for count in args.counts:
+        legacy, append = bench(count, rng, args.repeat)
+        print(f"{count:>10,}{legacy:20.2f}{append:18.3f}{legacy / append:10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""주문 매칭 지연 벤치마크
+
+호가창에 주문 N개(기본 10만 개)가 쌓인 상태에서 새 주문 하나의 매칭 지연을 잰다.
+  - find_match: 반대편 호가창에서 가격/수량이 맞는 주문 찾기
+  - 등록 + 매칭: store.add(호가창 갱신 포함) 후 find_match (등록한 주문은 반복마다 삭제)
+  - /매칭 리포트, 처음 불러올 때 호가창 구축
+
+    python bench_matching.py --count 100000 --ratio 0.5
+"""
+import argparse
+import random
+import statistics
+import time
+
+from bench_trades import legacy_trades
+from matching import MatchingEngine
+from store import TradeStore
+from trade import METHODS, TRADE_TYPES, UNITS, Trade, decode_trade
+
+
+def percentiles(samples):
+    """µs 단위 (p50, p99)"""
+    cuts = statistics.quantiles(samples, n=100)
+    return cuts[49] * 1_000_000, cuts[98] * 1_000_000
+
+
+def random_order(rng, user_id):
+    unit = rng.choice(UNITS)
+    return Trade(
+        1, user_id, "bench", rng.choice(TRADE_TYPES), rng.choice(METHODS), unit,
+        rng.randrange(10_000, 10_000_000), round(rng.uniform(-3, 5), 2)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="주문 매칭 지연 벤치마크")
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--ratio", type=float, default=0.5, help="MATCH_MIN_AMOUNT_RATIO")
+    parser.add_argument("--orders", type=int, default=20_000, help="측정할 새 주문 수")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    store = TradeStore(map(decode_trade, legacy_trades(args.count, rng)), next_id=args.count + 1)
+    start = time.perf_counter()
+    engine = MatchingEngine(store, min_amount_ratio=args.ratio)
+    build = time.perf_counter() - start
+
+    orders = [random_order(rng, 2_000_000_000_000_000_000 + i) for i in range(args.orders)]
+    matched = 0
+    find_samples = []
+    for order in orders:
+        start = time.perf_counter()
+        counter = engine.find_match(order)
+        find_samples.append(time.perf_counter() - start)
+        matched += counter is not None
+
+    add_samples = []
+    for order in orders:
+        order.id = None
+        start = time.perf_counter()
+        store.add(order)
+        engine.find_match(order)
+        add_samples.append(time.perf_counter() - start)
+        store.delete(order.id)
+
+    report_samples = []
+    for _ in range(50):
+        start = time.perf_counter()
+        engine.report()
+        report_samples.append(time.perf_counter() - start)
+
+    print(f"호가창 주문 {args.count:,}개, 새 주문 {args.orders:,}개 (매칭 {matched:,}), 수량 비율 {args.ratio}")
+    print("find_match        p50 {:7.1f}µs  p99 {:7.1f}µs".format(*percentiles(find_samples)))
+    print("등록 + 매칭       p50 {:7.1f}µs  p99 {:7.1f}µs".format(*percentiles(add_samples)))
+    print(f"/매칭 리포트      {statistics.median(report_samples) * 1000:.2f}ms")
+    print(f"호가창 구축       {build:.2f}초")
+
+
+if __name__ == "__main__":
+    main()
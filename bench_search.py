@@ -0,0 +1,94 @@
+"""전광판 검색 벤치마크
+
+거래 N개(기본 10만 개)에서 /전광판 필터 조건별로 TradeIndex.search와 전체 거래를 훑는 방식을 비교한다.
+두 결과가 같은지도 함께 확인한다. 자동완성 조회(단어/수량/프리미엄) 지연도 잰다.
+
+    python bench_search.py --count 100000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from bench_trades import legacy_trades
+from search import TradeIndex, TradeQuery, tokenize
+from store import TradeStore
+from trade import decode_trade
+
+QUERIES = {
+    "수량 범위 (버킷 하나)": TradeQuery("판매", "라이트닝", "sats", amount_min=1_000_000, amount_max=1_050_000),
+    "프리미엄 범위": TradeQuery("구매", premium_min=1.0, premium_max=1.2),
+    "검색어 두 단어": TradeQuery("판매", keyword="빠른 거래"),
+    "검색어 앞부분": TradeQuery("구매", keyword="네"),
+    "조건 조합": TradeQuery("판매", "온체인", "원", 100_000, 5_000_000, -1.0, 0.5, "토스"),
+}
+
+
+def scan(store, query):
+    """인덱스 없이 전체 거래를 훑는 검색 (search와 같은 조건)"""
+    words = tokenize(query.keyword) if query.keyword else None
+    results = []
+    for trade in store:
+        if trade.trade_type != query.side:
+            continue
+        if query.method is not None and trade.method != query.method:
+            continue
+        if query.unit is not None and trade.unit != query.unit:
+            continue
+        if query.premium_min is not None and trade.premium < query.premium_min:
+            continue
+        if query.premium_max is not None and trade.premium > query.premium_max:
+            continue
+        if query.amount_min is not None and trade.amount < query.amount_min:
+            continue
+        if query.amount_max is not None and trade.amount > query.amount_max:
+            continue
+        if words is not None:
+            tokens = tokenize(trade.note)
+            if not words or not all(any(token.startswith(word) for token in tokens) for word in words):
+                continue
+        results.append(trade)
+    results.sort(key=lambda t: (t.premium, t.id))
+    return results
+
+
+def timed(func, repeat):
+    """(결과, 소요 시간(ms)의 중앙값)"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return result, statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="전광판 검색 벤치마크")
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    store = TradeStore(map(decode_trade, legacy_trades(args.count, random.Random(args.seed))), next_id=args.count + 1)
+    start = time.perf_counter()
+    index = TradeIndex(store)
+    build = time.perf_counter() - start
+
+    print(f"거래 {args.count:,}개, 인덱스 구축 {build:.2f}초")
+    print(f"{'조건':20}{'결과':>8}{'인덱스 (ms)':>14}{'전체 훑기 (ms)':>16}")
+    for name, query in QUERIES.items():
+        found, search_ms = timed(lambda: index.search(query), args.repeat * 20)
+        expected, scan_ms = timed(lambda: scan(store, query), args.repeat)
+        if [t.id for t in found] != [t.id for t in expected]:
+            raise SystemExit(f"❌ {name}: 검색 결과가 전체 훑기와 다릅니다 ({len(found)} != {len(expected)})")
+        print(f"{name:20}{len(found):>8,}{search_ms:14.3f}{scan_ms:16.1f}")
+
+    scope = ("판매", "라이트닝", None)
+    _, complete_ms = timed(
+        lambda: (index.terms("빠"), index.amount_points(*scope), index.premium_points(*scope)), args.repeat * 200
+    )
+    print(f"자동완성 3종 (단어/수량/프리미엄) {complete_ms * 1000:.1f}µs")
+
+
+if __name__ == "__main__":
+    main()
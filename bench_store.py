@@ -0,0 +1,131 @@
+"""명령어 경로별 거래 저장소 마이크로벤치마크
+
+TradeStore 도입 전 전역 trades 리스트에서 하던 처리와 현재 TradeStore의 처리를
+거래 N개(기본 10만 개, 유저 5천 명) 상태에서 명령어 경로별로 비교한다.
+변경 경로는 매 반복 뒤 원래 상태로 되돌리며, 되돌리는 시간은 재지 않는다.
+
+    python bench_store.py --count 100000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from bench_trades import legacy_trades
+from store import TradeStore
+from trade import decode_trade
+
+
+def timed(func, repeat, restore=None):
+    """func를 repeat번 실행한 소요 시간(µs)의 중앙값. restore는 반복마다 func 결과로 호출"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - start) * 1_000_000)
+        if restore is not None:
+            restore(result)
+    return statistics.median(samples)
+
+
+# ---------- 리스트 (TradeStore 도입 전) ----------
+def list_paths(trades, user_id, trade):
+    def my_trades():
+        return [(i, t) for i, t in enumerate(trades) if t["user_id"] == user_id]
+
+    def board():
+        sell = sorted([t for t in trades if t["trade_type"] == "판매"], key=lambda x: x["premium"])
+        buy = sorted([t for t in trades if t["trade_type"] == "구매"], key=lambda x: x["premium"])
+        return sell, buy
+
+    def force_delete():
+        sell, buy = board()
+        target = (sell + buy)[len(trades) // 2]
+        trades.remove(target)
+        return target
+
+    def delete_user():
+        user_trades = [t for t in trades if t["user_id"] == user_id]
+        for t in user_trades:
+            trades.remove(t)
+        return user_trades
+
+    def register():
+        trades.append(dict(trade))
+
+    index = next(i for i, t in enumerate(trades) if t["user_id"] == user_id)
+
+    def edit():
+        # 수정 모달은 /내거래에서 받은 목록 위치로 바로 접근했음
+        trades[index]["premium"] = trades[index]["premium"] + 0.01
+
+    return {
+        "/내거래": (my_trades, None),
+        "/전광판": (board, None),
+        "/강제삭제": (force_delete, trades.append),
+        "/유저삭제": (delete_user, trades.extend),
+        "등록": (register, lambda _: trades.pop()),
+        "수정": (edit, None),
+    }
+
+
+# ---------- TradeStore ----------
+def store_paths(store, user_id, trade):
+    target_id = store.side("판매")[len(store.side("판매")) // 2].id
+
+    def board():
+        return store.side("판매"), store.side("구매")
+
+    def force_delete():
+        return store.delete(target_id)
+
+    def delete_user():
+        return store.delete_user(user_id)
+
+    def restore_user(deleted):
+        for t in deleted:
+            store.add(t)
+
+    def register():
+        return store.add(decode_trade(trade))
+
+    def edit():
+        target = store.user_trades(user_id)[0]
+        store.update(target.id, {"premium": target.premium + 0.01})
+
+    return {
+        "/내거래": (lambda: store.user_trades(user_id), None),
+        "/전광판": (board, None),
+        "/강제삭제": (force_delete, store.add),
+        "/유저삭제": (delete_user, restore_user),
+        "등록": (register, lambda added: store.delete(added.id)),
+        "수정": (edit, None),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="명령어 경로별 거래 저장소 마이크로벤치마크")
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    trades = legacy_trades(args.count, random.Random(args.seed))
+    store = TradeStore(map(decode_trade, trades), next_id=args.count + 1)
+    for t in trades:
+        t.pop("id")  # 리스트 시절에는 id가 없었음
+    user_id = trades[0]["user_id"]
+    new_trade = dict(trades[0])
+
+    list_results = {name: timed(func, args.repeat, restore) for name, (func, restore) in list_paths(trades, user_id, new_trade).items()}
+    store_results = {name: timed(func, args.repeat * 50, restore) for name, (func, restore) in store_paths(store, user_id, new_trade).items()}
+
+    print(f"거래 {args.count:,}개, 유저 {user_id}의 거래 {len(store.user_trades(user_id))}개")
+    print(f"{'경로':12}{'리스트 (µs)':>14}{'TradeStore (µs)':>18}{'배율':>10}")
+    for name, list_us in list_results.items():
+        store_us = store_results[name]
+        print(f"{name:12}{list_us:14.1f}{store_us:18.1f}{list_us / store_us:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""거래 레코드 메모리/저장 크기 벤치마크
+
+구버전 형식(거래 dict + amount_formatted + ISO 시각, 키가 있는 JSON)과
+현재 형식(Trade __slots__ 객체, FORMAT 2 row 스냅샷)을 같은 거래 N개로 비교한다.
+메모리는 스냅샷 JSON을 읽어 거래 목록을 만든 뒤 남아 있는 크기(tracemalloc)로 잰다.
+
+    python bench_trades.py --count 100000
+"""
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+from datetime import datetime
+
+from trade import FORMAT, METHODS, TRADE_TYPES, UNITS, Trade, decode_trade
+
+
+def _dumps(obj):
+    # storage의 스냅샷과 같은 직렬화 (공백 없는 JSON)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def legacy_trades(count, rng):
+    now = int(time.time())
+    trades = []
+    for i in range(1, count + 1):
+        unit = rng.choice(UNITS)
+        amount = rng.randrange(10_000, 10_000_000)
+        registered = now - rng.randrange(0, 7 * 86400)
+        trade = {
+            "guild_id": 1_100_000_000_000_000_000, "user_id": 1_000_000_000_000_000_000 + rng.randrange(5_000),
+            "user_name": f"user{rng.randrange(5_000)}", "trade_type": rng.choice(TRADE_TYPES),
+            "method": rng.choice(METHODS), "unit": unit, "amount": amount, "amount_formatted": f"{amount:,} {unit}",
+            "premium": round(rng.uniform(-3, 5), 2), "note": rng.choice(["", "빠른 거래 원해요", "네고 가능", "토스 송금"]),
+            "timestamp": datetime.fromtimestamp(registered).isoformat(), "id": i,
+        }
+        if rng.random() < 0.8:
+            trade["expires_at"] = registered + 7 * 86400
+        trades.append(trade)
+    return trades
+
+
+def measure(loader, text):
+    """text를 읽어 만든 거래 목록이 차지하는 메모리(바이트)와 읽는 데 걸린 시간(초)"""
+    start = time.perf_counter()
+    loader(text)
+    elapsed = time.perf_counter() - start  # tracemalloc은 할당마다 느려지므로 따로 잼
+    gc.collect()
+    tracemalloc.start()
+    trades = loader(text)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return trades, size, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="거래 레코드 메모리/저장 크기 벤치마크")
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    legacy = legacy_trades(args.count, random.Random(args.seed))
+    legacy_text = _dumps({"seq": 0, "next_id": args.count + 1, "trades": legacy})
+    legacy_indent = json.dumps(legacy, ensure_ascii=False, indent=2)  # 저널 도입 전 save_trades 형식
+    del legacy
+
+    start = time.perf_counter()
+    trades = [decode_trade(t) for t in json.loads(legacy_text)["trades"]]
+    convert = time.perf_counter() - start
+    compact_text = _dumps({"format": FORMAT, "seq": 0, "next_id": args.count + 1, "trades": [t.to_row() for t in trades]})
+    del trades
+
+    _, legacy_mem, legacy_load = measure(lambda text: json.loads(text)["trades"], legacy_text)
+    trades, compact_mem, compact_load = measure(lambda text: [Trade.from_row(row) for row in json.loads(text)["trades"]], compact_text)
+
+    start = time.perf_counter()
+    rows = [t.to_row() for t in trades]
+    encode = time.perf_counter() - start
+    start = time.perf_counter()
+    _dumps(rows)
+    dump = time.perf_counter() - start
+
+    mib = 1024 * 1024
+    print(f"거래 {args.count:,}개")
+    print(f"{'':24}{'구버전 dict':>14}{'Trade':>14}{'비율':>8}")
+    print(f"{'메모리 (MiB)':24}{legacy_mem / mib:14.1f}{compact_mem / mib:14.1f}{compact_mem / legacy_mem:8.2f}")
+    print(f"{'스냅샷 크기 (MiB)':24}{len(legacy_text.encode()) / mib:14.1f}{len(compact_text.encode()) / mib:14.1f}"
+          f"{len(compact_text.encode()) / len(legacy_text.encode()):8.2f}")
+    print(f"{'스냅샷 읽기 (ms)':24}{legacy_load * 1000:14.0f}{compact_load * 1000:14.0f}{compact_load / legacy_load:8.2f}")
+    print(f"들여쓰기 JSON(save_trades) {len(legacy_indent.encode()) / mib:.1f} MiB | "
+          f"구버전 -> Trade 변환 {convert * 1000:.0f}ms | row 변환 {encode * 1000:.0f}ms + JSON {dump * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+import asyncio
+import json
+import os
+import discord
+from datetime import datetime
+from store import TRADE_TYPES
+from outbound import PRIORITY_BOARD
+from validation import NOTE_MAX_LENGTH
+
+# ============== 전광판 렌더링 ==============
+# 페이지마다 줄 수를 고정하므로(PAGE_MAX_LINES) 페이지 경계는 정렬된 목록의 위치만으로 정해지고,
+# 전광판을 그릴 때는 보여줄 페이지의 거래만 문자열로 만든다 (호가창 크기와 무관한 비용).
+# 거래별 문자열 조각은 처음 그릴 때 만들어 두고 수정/삭제 시에만 버린다.
+# 시세 환산 금액은 그리는 페이지의 거래에 대해서만 계산한다.
+# 페이지 Embed는 (side_version, 시세 tick)이 그대로면 캐시된 Embed를 재사용한다.
+
+SIDE_LABELS = {"판매": "🔴 판매", "구매": "🟢 구매"}
+SIDE_KEYS = {"판매": "sell", "구매": "buy"}
+SIDES_BY_KEY = {v: k for k, v in SIDE_KEYS.items()}
+
+# Discord 제한: 필드 값 1024자, Embed 전체 6000자. 제목/필드 이름/푸터 여유분을 뺀 값
+FIELD_CHAR_LIMIT = 1024
+PAGE_CHAR_LIMIT = 4000
+# 전광판 한 줄의 최대 길이: 앞부분(id, 방식, 멘션, 수량, 프리미엄) ~70자 + 시세 환산 ~60자 + 비고 3 + NOTE_MAX_LENGTH자
+LINE_MAX_CHARS = 140 + NOTE_MAX_LENGTH
+PAGE_MAX_LINES = PAGE_CHAR_LIMIT // (LINE_MAX_CHARS + 1)
+
+
+def format_board_line(t):
+    """(앞부분, 비고) 조각. 시세 환산 금액은 그 사이에 들어감"""
+    head = f"`#{t.id}` {'⚡' if t.method=='라이트닝' else '🔗'} <@{t.user_id}> | {t.amount_formatted} | +{t.premium}%"
+    return head, f" | {t.note}" if t.note else ""
+
+
+def price_suffixes(trades, price):
+    """시세 기준 환산 문자열 목록: 적용 가격(원/BTC)과 sats↔원 환산 금액"""
+    if not price:
+        return [""] * len(trades)
+    suffixes = []
+    for t in trades:
+        effective = price * (1 + t.premium / 100)
+        if t.unit == "sats":
+            other = f"≈ {t.amount * effective / 100_000_000:,.0f}원"
+        else:
+            other = f"≈ {t.amount / effective * 100_000_000:,.0f} sats"
+        suffixes.append(f" | {other} (@{effective:,.0f}원)")
+    return suffixes
+
+
+def page_count(count):
+    """거래 count개의 페이지 수 (거래가 없어도 1)"""
+    return max(1, -(-count // PAGE_MAX_LINES))
+
+
+def page_slice(trades, page):
+    """page번째(0부터, 범위를 벗어나면 가까운 페이지로 맞춤) 페이지의 거래와 맞춘 페이지 번호"""
+    page = max(0, min(page, page_count(len(trades)) - 1))
+    return trades[page * PAGE_MAX_LINES:(page + 1) * PAGE_MAX_LINES], page
+
+
+def split_fields(lines):
+    """한 페이지의 줄 목록을 필드 값 제한(1024자)에 맞춰 나눈 필드 값 목록"""
+    fields, current, size = [], [], 0
+    for line in lines:
+        if current and size + len(line) + 1 > FIELD_CHAR_LIMIT:
+            fields.append("\n".join(current))
+            current, size = [], 0
+        current.append(line)
+        size += len(line) + 1
+    if current:
+        fields.append("\n".join(current))
+    return fields
+
+
+class BoardRenderer:
+    def __init__(self, store, oracle=None):
+        self.store = store
+        self.oracle = oracle
+        self._parts = {}
+        self._embeds = {}
+        self.hits = 0
+        self.misses = 0
+        store.listeners.append(self._on_change)
+
+    def _on_change(self, op, trade):
+        # 줄 조각은 전광판을 그릴 때 만듦 (변경 시에는 무효화만)
+        if op == "clear":
+            self._parts.clear()
+        elif op in ("update", "delete"):
+            self._parts.pop(trade.id, None)
+
+    def _line_parts(self, trade):
+        parts = self._parts.get(trade.id)
+        if parts is None:
+            parts = self._parts[trade.id] = format_board_line(trade)
+        return parts
+
+    def _key(self, side):
+        return self.store.side_version[side], self.oracle.tick if self.oracle else 0
+
+    def lines_for(self, trades):
+        """거래 목록(한 페이지 분량)의 전광판 줄 목록 (캐시된 조각 재사용)"""
+        parts = [self._line_parts(t) for t in trades]
+        suffixes = price_suffixes(trades, self.oracle.price if self.oracle else None)
+        return [head + suffix + tail for (head, tail), suffix in zip(parts, suffixes)]
+
+    def page_count(self, side):
+        return page_count(len(self.store.side(side)))
+
+    # ---------- Embed ----------
+    def page_embed(self, side, page):
+        """side의 page번째(0부터) 페이지 Embed. 범위를 벗어나면 가까운 페이지로 맞춤"""
+        trades, page = page_slice(self.store.side(side), page)
+        key = self._key(side)
+        cached = self._embeds.get((side, page))
+        if cached is not None and cached[0] == key:
+            self.hits += 1
+            return cached[1], page
+        self.misses += 1
+
+        embed = discord.Embed(title="📊 비트코인 P2P 전광판", color=discord.Color.gold(), timestamp=datetime.now())
+        fields = split_fields(self.lines_for(trades))
+        for n, value in enumerate(fields):
+            embed.add_field(name=SIDE_LABELS[side] if n == 0 else "\u200b", value=value, inline=False)
+        if not fields:
+            embed.add_field(name=SIDE_LABELS[side], value="등록된 거래가 없습니다.", inline=False)
+        embed.set_footer(text=f"{SIDE_LABELS[side]} {page + 1}/{self.page_count(side)} 페이지{self._price_footer()} · 판매자를 클릭하면 DM을 보낼 수 있습니다")
+
+        self._embeds[(side, page)] = (key, embed)
+        return embed, page
+
+    def filtered_embed(self, side, trades, page, description):
+        """검색 결과 Embed (캐시하지 않음). (embed, 맞춘 페이지, 페이지 수) 반환"""
+        shown, page = page_slice(trades, page)
+        count = page_count(len(trades))
+        embed = discord.Embed(title="🔍 전광판 검색", description=description, color=discord.Color.gold(), timestamp=datetime.now())
+        fields = split_fields(self.lines_for(shown))
+        for n, value in enumerate(fields):
+            embed.add_field(name=f"{SIDE_LABELS[side]} ({len(trades)}건)" if n == 0 else "\u200b", value=value, inline=False)
+        if not fields:
+            embed.add_field(name=SIDE_LABELS[side], value="조건에 맞는 거래가 없습니다.", inline=False)
+        embed.set_footer(text=f"{SIDE_LABELS[side]} {page + 1}/{count} 페이지{self._price_footer()}")
+        return embed, page, count
+
+    # ---------- 고정 전광판 요약 ----------
+    def summary_embed(self):
+        """판매/구매 각각 첫 필드만 담은 요약 Embed (고정 전광판 메시지용)"""
+        key = (self.store.version, self.oracle.tick if self.oracle else 0)
+        cached = self._embeds.get("summary")
+        if cached is not None and cached[0] == key:
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+
+        embed = discord.Embed(title="📊 비트코인 P2P 전광판", color=discord.Color.gold(), timestamp=datetime.now())
+        for side in TRADE_TYPES:
+            trades = self.store.side(side)
+            fields = split_fields(self.lines_for(trades[:PAGE_MAX_LINES]))
+            value = fields[0] if fields else "등록된 거래가 없습니다."
+            embed.add_field(name=f"{SIDE_LABELS[side]} ({len(trades)}건)", value=value, inline=False)
+        embed.set_footer(text=f"아래 버튼으로 전체 목록을 볼 수 있습니다{self._price_footer()} · 판매자를 클릭하면 DM을 보낼 수 있습니다")
+
+        self._embeds["summary"] = (key, embed)
+        return embed
+
+    def _price_footer(self):
+        if self.oracle is None or not self.oracle.price:
+            return ""
+        return f" · BTC {self.oracle.price:,.0f}원 기준"
+
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "cached_lines": len(self._parts)}
+
+
+# ============== 고정 전광판 메시지 ==============
+# 길드마다 전광판 채널에 메시지 하나를 고정해 두고, 거래가 바뀌면 그 메시지를 수정한다.
+# debounce 동안 들어온 변경은 한 번의 수정으로 묶고, 수정 사이에는 min_interval 이상 간격을 둔다.
+# 메시지 위치는 길드 파티션 디렉토리에 저장하므로 샤드 프로세스끼리 파일을 공유하지 않는다.
+
+class LiveBoard:
+    def __init__(self, client, channel_name, renderer_for, path_for, view_factory, debounce=3.0, min_interval=10.0,
+                 outbound=None):
+        self.client = client
+        self.outbound = outbound
+        self.channel_name = channel_name
+        self.renderer_for = renderer_for
+        self.path_for = path_for
+        self.view_factory = view_factory
+        self.debounce = debounce
+        self.min_interval = min_interval
+        self.messages = {}  # guild_id -> {"channel_id", "message_id"} 또는 None
+        self.edits = 0
+        self._dirty = set()
+        self._task = None
+        self._last_edit = 0.0
+
+    def _entry(self, guild_id):
+        if guild_id not in self.messages:
+            path = self.path_for(guild_id)
+            entry = None
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+            self.messages[guild_id] = entry
+        return self.messages[guild_id]
+
+    def jump_url(self, guild_id):
+        entry = self._entry(guild_id)
+        if entry is None:
+            return None
+        return f"https://discord.com/channels/{guild_id}/{entry['channel_id']}/{entry['message_id']}"
+
+    def is_live_message(self, message):
+        if message is None or message.guild is None:
+            return False
+        entry = self._entry(message.guild.id)
+        return entry is not None and entry["message_id"] == message.id
+
+    def schedule(self, guild_id):
+        """변경 알림: 진행 중인 수정 작업이 없으면 새로 시작"""
+        self._dirty.add(guild_id)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while self._dirty:
+            delay = max(self.debounce, self._last_edit + self.min_interval - loop.time())
+            await asyncio.sleep(delay)
+            dirty, self._dirty = self._dirty, set()
+            self._last_edit = loop.time()
+            for guild_id in dirty:
+                guild = self.client.get_guild(guild_id)
+                if guild is None:
+                    continue
+                if self.outbound is not None:
+                    # 발신 스케줄러가 아직 보내지 않은 이전 수정은 버리고 이번 수정만 보냄
+                    key = ("board", guild_id)
+                    self.outbound.submit(lambda guild=guild: self.ensure(guild), key, PRIORITY_BOARD, key=key)
+                    continue
+                try:
+                    await self.ensure(guild)
+                except discord.HTTPException as e:
+                    print(f"전광판 갱신 실패 ({guild.name}): {e}")
+
+    async def ensure(self, guild):
+        """길드의 전광판 메시지를 최신 내용으로 수정하고 반환 (없으면 새로 만들어 고정)"""
+        channel = discord.utils.get(guild.text_channels, name=self.channel_name)
+        if channel is None:
+            return None
+        embed = self.renderer_for(guild.id).summary_embed()
+        view = self.view_factory(guild.id)
+
+        entry = self._entry(guild.id)
+        if entry is not None and entry["channel_id"] == channel.id:
+            try:
+                message = await channel.get_partial_message(entry["message_id"]).edit(embed=embed, view=view)
+                self.edits += 1
+                return message
+            except discord.NotFound:
+                pass
+
+        message = await channel.send(embed=embed, view=view)
+        self.edits += 1
+        try:
+            await message.pin()
+        except discord.HTTPException:
+            pass  # 고정 권한이 없어도 메시지는 사용
+        self.messages[guild.id] = {"channel_id": channel.id, "message_id": message.id}
+        self._save(guild.id)
+        return message
+
+    def _save(self, guild_id):
+        path = self.path_for(guild_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.messages[guild_id], f)
+        os.replace(tmp_path, path)
@@ -1,32 +1,101 @@
+import time
+BOOT = time.perf_counter()  # 시작 시간 측정 기준 (import 시간 포함)
+
 import discord
 from discord import app_commands
 from discord.app_commands import checks
 from discord.ui import Modal, TextInput, View, Button
-import json
+from discord.ext import tasks
+from typing import Literal, Optional
+from config import (
+    DISCORD_TOKEN, BOARD_CHANNEL_NAME, HELPER_ROLE_NAME, SHARD_COUNT, SHARD_IDS, COMMAND_SYNC, DEV_GUILD_ID,
+    DATA_DIR, STORAGE_BACKEND, LEGACY_GUILD_ID,
+    JOURNAL_COMPACT_BYTES, JOURNAL_COMPACT_INTERVAL, PERSIST_DURABILITY, PERSIST_COALESCE_WINDOW,
+    BOARD_EDIT_DEBOUNCE, BOARD_EDIT_INTERVAL,
+    TRADE_TTL_HOURS, GUILD_TRADE_TTL_HOURS, EXPIRY_NOTICE_HOURS,
+    PRICE_PROVIDER, PRICE_FIXED_KRW, PRICE_TTL, PRICE_BOARD_REFRESH_PCT, MATCH_MIN_AMOUNT_RATIO,
+    METRICS_HOST, METRICS_PORT, PROFILER_INTERVAL,
+    OUTBOUND_DM_RATE, OUTBOUND_BOARD_RATE, AUTO_DEFER_AFTER,
+)
+from partitions import Partitions
+from board import LiveBoard, SIDE_LABELS, SIDE_KEYS, SIDES_BY_KEY, PAGE_CHAR_LIMIT
+from store import TRADE_TYPES
+from trade import Trade
+from validation import validate_trade_input
+from search import TradeQuery
+from expiry import ExpirySweeper
+from price import PriceOracle, FixedPriceProvider, UpbitPriceProvider
+from metrics import Registry, MetricsServer, timed
+from outbound import OutboundScheduler, respond
+from command_sync import sync_commands
+from profiler import SamplingProfiler
+import asyncio
+import gc
+import io
 import os
-from datetime import datetime
-from config import DISCORD_TOKEN, BOARD_CHANNEL_NAME, HELPER_ROLE_NAME, DATA_FILE
-import re
-import math
-import tempfile
-import shutil
 
 # Intents 설정
 intents = discord.Intents.default()
 intents.message_content = True
 intents.members = True
 
-client = discord.Client(intents=intents)
-tree = app_commands.CommandTree(client)
+if SHARD_COUNT or SHARD_IDS:
+    client = discord.AutoShardedClient(
+        intents=intents,
+        shard_count=int(SHARD_COUNT) if SHARD_COUNT and SHARD_COUNT != "auto" else None,
+        shard_ids=SHARD_IDS
+    )
+else:
+    client = discord.Client(intents=intents)
+
+# ============== 메트릭 ==============
+# 슬래시 명령어는 CommandTree 훅(interaction_check → 완료/오류 이벤트)으로,
+# 버튼/모달 핸들러는 @timed 데코레이터로 실행 시간을 잰다.
+registry = Registry()
+handler_seconds = registry.histogram(
+    "citadel_handler_seconds", "슬래시 명령어/버튼/모달 처리 시간", ("kind", "name", "outcome")
+)
+cooldown_rejections = registry.counter(
+    "citadel_cooldown_rejections_total", "쿨다운으로 거절된 명령어 수", ("command",)
+)
+persist_seconds = registry.histogram(
+    "citadel_persist_seconds", "저장소 기록/압축 시간", ("op",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+persist_bytes = registry.counter("citadel_persist_bytes_total", "저장소에 기록한 바이트 수", ("op",))
+persist_records = registry.counter("citadel_persist_records_total", "저장소에 기록한 레코드 수", ("op",))
+metrics_server = MetricsServer(registry, METRICS_HOST, METRICS_PORT)
+profiler = SamplingProfiler(interval=PROFILER_INTERVAL)
+
+class InstrumentedTree(app_commands.CommandTree):
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        interaction.extras["started"] = time.perf_counter()
+        return True
+
+def observe_command(interaction: discord.Interaction, outcome: str):
+    started = interaction.extras.get("started")
+    if started is not None and interaction.command is not None:
+        handler_seconds.observe(
+            time.perf_counter() - started, kind="command", name=interaction.command.qualified_name, outcome=outcome
+        )
+
+tree = InstrumentedTree(client)
+
+@client.event
+async def on_app_command_completion(interaction: discord.Interaction, command):
+    observe_command(interaction, "ok")
 
 @tree.error
 async def on_app_command_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
     if isinstance(error, app_commands.CommandOnCooldown):
+        observe_command(interaction, "cooldown")
+        cooldown_rejections.inc(command=interaction.command.qualified_name if interaction.command else "")
         await interaction.response.send_message(
             f"⏳ 너무 빠릅니다! **{error.retry_after:.1f}초** 후에 다시 시도해주세요.",
             ephemeral=True
         )
     else:
+        observe_command(interaction, "error")
         import traceback
         traceback.print_exception(type(error), error, error.__traceback__)
         if not interaction.response.is_done():
@@ -36,120 +105,167 @@ async def on_app_command_error(interaction: discord.Interaction, error: app_comm
             )
 
 # ============== 데이터 관리 ==============
-def load_trades():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return []
-
-def save_trades(data):
-    """Atomic write: 임시 파일에 쓴 후 rename으로 교체"""
-    dir_name = os.path.dirname(DATA_FILE)
-    os.makedirs(dir_name, exist_ok=True)
-    
-    # 같은 디렉토리에 임시 파일 생성
-    fd, tmp_path = tempfile.mkstemp(dir=dir_name, suffix=".tmp", prefix="trades_")
-    try:
-        with os.fdopen(fd, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-            f.flush()
-            os.fsync(f.fileno())
-        
-        # 기존 파일 백업 (최근 3개 유지)
-        if os.path.exists(DATA_FILE):
-            backup_dir = os.path.join(dir_name, "backups")
-            os.makedirs(backup_dir, exist_ok=True)
-            backup_name = f"trades_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            backup_path = os.path.join(backup_dir, backup_name)
-            shutil.copy2(DATA_FILE, backup_path)
-            
-            # 오래된 백업 정리 (최근 3개만 유지)
-            backups = sorted(
-                [os.path.join(backup_dir, f) for f in os.listdir(backup_dir) if f.endswith('.json')],
-                key=os.path.getmtime
-            )
-            while len(backups) > 3:
-                os.unlink(backups.pop(0))
-        
-        # Atomic rename
-        os.replace(tmp_path, DATA_FILE)
-    except Exception:
-        if os.path.exists(tmp_path):
-            os.unlink(tmp_path)
-        raise
-
-trades = load_trades()
-
-# ============== 입력 검증 ==============
-AMOUNT_LIMITS = {
-    "sats": {"min": 1_000, "max": 100_000_000, "display": "1,000 ~ 100,000,000 sats"},
-    "won": {"min": 1_000, "max": 100_000_000, "display": "1,000 ~ 100,000,000 원"}
-}
-PREMIUM_MIN = -50.0
-PREMIUM_MAX = 100.0
-NOTE_MAX_LENGTH = 200
-
-def sanitize_note(raw: str) -> str:
-    """메모 필드 정제: 마크다운/멘션 무효화"""
-    if not raw or not raw.strip():
-        return ""
-    text = raw.strip()
-    text = text.replace("@everyone", "@\u200beveryone")
-    text = text.replace("@here", "@\u200bhere")
-    text = re.sub(r'<(@[!&]?\d+|#\d+)>', r'`\1`', text)
-    text = text.replace("```", "\\`\\`\\`")
-    text = re.sub(r'\n{3,}', '\n\n', text)
-    return text
-
-def validate_trade_input(amount_raw: str, premium_raw: str, note_raw: str, unit: str):
-    """거래 입력값 검증"""
-    errors = []
-    
-    # 수량 검증
-    amount_cleaned = amount_raw.strip().replace(",", "").replace(" ", "")
-    try:
-        amount_num = int(amount_cleaned)
-    except (ValueError, OverflowError):
-        errors.append("• **수량**: 숫자만 입력해주세요. (예: 100000 또는 100,000)")
-        amount_num = None
-    
-    if amount_num is not None:
-        limits = AMOUNT_LIMITS.get(unit)
-        if limits is None:
-            errors.append(f"• **단위**: 알 수 없는 단위입니다: {unit}")
-        else:
-            if amount_num <= 0:
-                errors.append("• **수량**: 수량은 양수여야 합니다.")
-            elif amount_num < limits["min"]:
-                errors.append(f"• **수량**: 최소 수량은 {limits['display']}입니다.")
-            elif amount_num > limits["max"]:
-                errors.append(f"• **수량**: 최대 수량은 {limits['display']}입니다.")
-    
-    # 프리미엄 검증
-    premium_cleaned = premium_raw.strip().replace("%", "").replace(" ", "")
-    try:
-        premium_num = float(premium_cleaned)
-    except (ValueError, OverflowError):
-        errors.append("• **프리미엄**: 숫자만 입력해주세요. (예: 5 또는 -3.5)")
-        premium_num = None
-    
-    if premium_num is not None:
-        if math.isinf(premium_num) or math.isnan(premium_num):
-            errors.append("• **프리미엄**: 유효한 숫자를 입력해주세요.")
-        elif premium_num < PREMIUM_MIN:
-            errors.append(f"• **프리미엄**: 프리미엄은 {PREMIUM_MIN}% 이상이어야 합니다.")
-        elif premium_num > PREMIUM_MAX:
-            errors.append(f"• **프리미엄**: 프리미엄은 {PREMIUM_MAX}% 이하여야 합니다.")
-    
-    # 메모 정제
-    note_clean = sanitize_note(note_raw)
-    if len(note_clean) > NOTE_MAX_LENGTH:
-        errors.append(f"• **메모**: 메모는 {NOTE_MAX_LENGTH}자 이하로 입력해주세요. (현재: {len(note_clean)}자)")
-    
-    if errors:
-        return None, "❌ 입력값을 확인해주세요:\n" + "\n".join(errors)
-    
-    return (amount_num, round(premium_num, 2) if premium_num is not None else 0, note_clean), None
+# BTC/KRW 시세 (전광판 환산 금액 표시용)
+if PRICE_PROVIDER == "upbit":
+    oracle = PriceOracle(UpbitPriceProvider(), ttl=PRICE_TTL)
+elif PRICE_PROVIDER == "fixed":
+    oracle = PriceOracle(FixedPriceProvider(PRICE_FIXED_KRW), ttl=PRICE_TTL)
+else:
+    oracle = None
+
+# 거래는 길드별 파티션에 저장 (partition.store / partition.writer / partition.board)
+partitions = Partitions(
+    DATA_DIR, STORAGE_BACKEND,
+    durability=PERSIST_DURABILITY, coalesce_window=PERSIST_COALESCE_WINDOW, compact_bytes=JOURNAL_COMPACT_BYTES,
+    oracle=oracle, match_amount_ratio=MATCH_MIN_AMOUNT_RATIO
+)
+if LEGACY_GUILD_ID is not None:
+    partitions.adopt_legacy(LEGACY_GUILD_ID)
+
+async def get_partition(interaction: discord.Interaction):
+    """상호작용 길드의 파티션 (아직 불러오는 중이면 준비될 때까지 기다림)"""
+    return await partitions.acquire(interaction.guild_id)
+
+# 백그라운드 발신(DM, 고정 전광판 수정)은 경로별 속도 제한을 지키며 상호작용 응답 뒤로 미룸
+outbound = OutboundScheduler(
+    {"dm": (OUTBOUND_DM_RATE, 5), "board": (OUTBOUND_BOARD_RATE, 2)},
+    defer_after=AUTO_DEFER_AFTER
+)
+
+def send_dm(user_id, content, view_factory=None):
+    """DM 발송을 발신 스케줄러에 맡김 (DM 차단 등으로 실패하면 무시)"""
+    async def send():
+        try:
+            user = client.get_user(user_id) or await client.fetch_user(user_id)
+            await user.send(content, view=view_factory() if view_factory else None)
+        except discord.HTTPException:
+            pass
+    outbound.submit(send, ("dm", 0))
+
+live_board = LiveBoard(
+    client, BOARD_CHANNEL_NAME,
+    renderer_for=lambda guild_id: partitions.get(guild_id).board,
+    path_for=lambda guild_id: os.path.join(partitions.guild_dir(guild_id), "board_message.json"),
+    view_factory=lambda guild_id: BoardView("판매", 0, partitions.get(guild_id).board.page_count("판매")),
+    debounce=BOARD_EDIT_DEBOUNCE, min_interval=BOARD_EDIT_INTERVAL, outbound=outbound
+)
+# 만료 시각/알림 여부만 바뀐 경우("expiry")는 전광판 내용이 그대로이므로 수정하지 않음
+partitions.listeners.append(lambda guild_id, op, trade: op != "expiry" and live_board.schedule(guild_id))
+
+# ============== 거래 만료 ==============
+def trade_ttl(guild_id, trade_type):
+    hours = GUILD_TRADE_TTL_HOURS.get(guild_id, {}).get(trade_type, TRADE_TTL_HOURS[trade_type])
+    return hours * 3600
+
+async def notify_expiry(partition, trade):
+    """만료 전 DM으로 연장 버튼 안내"""
+    fields = {"expiry_noticed": True}
+    partition.store.update_expiry(trade.id, fields)
+    await partition.writer.update(trade.id, fields)
+
+    def bump_view():
+        view = View(timeout=None)
+        view.add_item(TradeBumpButton(partition.guild_id, trade.id))
+        return view
+
+    send_dm(
+        trade.user_id,
+        f"⏰ 등록하신 거래 **#{trade.id}** ({trade.trade_type} | {trade.amount_formatted} | {trade.premium}%)가 "
+        f"<t:{trade.expires_at}:R> 만료됩니다. 계속 게시하려면 연장해주세요.",
+        bump_view
+    )
+
+async def expire_trade(partition, trade):
+    partition.store.delete(trade.id)
+    await partition.writer.delete(trade.id)
+
+sweeper = ExpirySweeper(trade_ttl, notify_expiry, expire_trade, notice_before=EXPIRY_NOTICE_HOURS * 3600)
+
+def track_expiry(partition):
+    # 만료 기능 도입 이전 거래는 등록 시각 기준으로 만료 시각을 정함 (최소 알림 기간은 보장)
+    now = time.time()
+    legacy = []
+    for trade in partition.store:
+        if trade.expires_at is not None:
+            continue
+        expires_at = sweeper.expiry_for(partition.guild_id, trade.trade_type, now=trade.timestamp or now)
+        if expires_at is not None:
+            legacy.append((trade.id, {"expires_at": max(expires_at, int(now + sweeper.notice_before))}))
+    for trade_id, fields in legacy:
+        partition.store.update_expiry(trade_id, fields)
+    if legacy:
+        async def persist_legacy():
+            for trade_id, fields in legacy:
+                await partition.writer.update(trade_id, fields)
+        asyncio.get_running_loop().create_task(persist_legacy())
+    sweeper.track_partition(partition)
+
+partitions.load_listeners.append(track_expiry)
+
+@tasks.loop(seconds=JOURNAL_COMPACT_INTERVAL)
+async def compact_journal():
+    await partitions.compact_all()
+
+board_price = None  # 시세 때문에 고정 전광판을 마지막으로 갱신한 시세
+
+@tasks.loop(seconds=PRICE_TTL)
+async def refresh_price():
+    # 시세가 PRICE_BOARD_REFRESH_PCT 이상 움직였을 때만 고정 전광판의 환산 금액을 갱신
+    # (전광판/검색 페이지는 보여줄 때 그 페이지의 환산 금액만 다시 계산하므로 따로 할 일 없음)
+    global board_price
+    price = await oracle.get()
+    if not price or price == board_price:
+        return
+    if board_price and abs(price - board_price) / board_price * 100 < PRICE_BOARD_REFRESH_PCT:
+        return
+    board_price = price
+    for partition in partitions:
+        live_board.schedule(partition.guild_id)
+
+# ---------- 메트릭 수집 ----------
+def track_persistence(partition):
+    def listener(op, seconds, size, count):
+        persist_seconds.observe(seconds, op=op)
+        persist_bytes.inc(size, op=op)
+        persist_records.inc(count, op=op)
+    partition.writer.listeners.append(listener)
+
+partitions.load_listeners.append(track_persistence)
+
+registry.gauge(
+    "citadel_trades", "길드/종류별 등록된 거래 수", ("guild", "side"),
+    collect=lambda: [((p.guild_id, side), len(p.store.side(side))) for p in partitions for side in TRADE_TYPES]
+)
+registry.gauge("citadel_partitions", "메모리에 올라온 길드 파티션 수", collect=lambda: [((), len(partitions))])
+registry.counter(
+    "citadel_board_cache_total", "전광판 Embed 캐시 조회 수", ("result",),
+    collect=lambda: [(("hit",), sum(p.board.hits for p in partitions)), (("miss",), sum(p.board.misses for p in partitions))]
+)
+registry.counter("citadel_board_edits_total", "고정 전광판 메시지 수정/전송 수", collect=lambda: [((), live_board.edits)])
+registry.counter("citadel_trades_expired_total", "만료로 삭제된 거래 수", collect=lambda: [((), sweeper.expired)])
+registry.counter(
+    "citadel_outbound_total", "백그라운드 발신 작업 수", ("result",),
+    collect=lambda: [(("sent",), outbound.sent), (("dropped",), outbound.dropped), (("failed",), outbound.failed)]
+)
+registry.gauge("citadel_outbound_pending", "발신 대기 중인 작업 수", collect=lambda: [((), outbound.pending)])
+registry.counter("citadel_interactions_deferred_total", "자동 defer된 상호작용 수", collect=lambda: [((), outbound.deferred)])
+if oracle is not None:
+    registry.counter(
+        "citadel_price_fetches_total", "시세 조회 수", ("result",),
+        collect=lambda: [(("ok",), oracle.fetches - oracle.failures), (("error",), oracle.failures)]
+    )
+
+# ============== 주문 매칭 ==============
+def describe_trade(trade):
+    return f"**#{trade.id}** {trade.trade_type} | {trade.method} | {trade.amount_formatted} | 프리미엄 {trade.premium:+.2f}%"
+
+def notify_match(trade, counter):
+    """가격이 맞는 기존 거래의 등록자에게 새 거래를 DM으로 알림"""
+    send_dm(
+        counter.user_id,
+        f"🤝 등록하신 거래 {describe_trade(counter)}와 가격이 맞는 거래가 등록되었습니다.\n"
+        f"{describe_trade(trade)} - <@{trade.user_id}>"
+    )
 
 # ============== 권한 체크 ==============
 def is_admin_or_helper(user):
@@ -157,19 +273,19 @@ def is_admin_or_helper(user):
     return user.guild_permissions.administrator or has_helper
 
 # ============== 헬퍼 함수 ==============
-def get_user_trades(user_id):
-    return [(i, t) for i, t in enumerate(trades) if t["user_id"] == user_id]
-
 def build_my_trades_embed(user_trades):
+    # Discord 제한(필드 25개, Embed 6000자)을 넘으면 나머지는 개수만 표시
     embed = discord.Embed(title="📋 내 거래 목록", color=discord.Color.blue())
-    for num, (idx, t) in enumerate(user_trades):
-        emoji = "⚡" if t["method"] == "라이트닝" else "🔗"
-        note = f"\n비고: {t['note']}" if t.get('note') else ""
-        embed.add_field(
-            name=f"{num+1}. {t['trade_type']} {emoji} {t['method']}",
-            value=f"수량: {t['amount_formatted']}\n프리미엄: {t['premium']}%{note}",
-            inline=False
-        )
+    for num, t in enumerate(user_trades):
+        emoji = "⚡" if t.method == "라이트닝" else "🔗"
+        note = f"\n비고: {t.note}" if t.note else ""
+        expiry = f"\n만료: <t:{t.expires_at}:R>" if t.expires_at else ""
+        name = f"{num+1}. {t.trade_type} {emoji} {t.method} (#{t.id})"
+        value = f"수량: {t.amount_formatted}\n프리미엄: {t.premium}%{note}{expiry}"
+        if num >= 24 or len(embed) + len(name) + len(value) > PAGE_CHAR_LIMIT:
+            embed.set_footer(text=f"외 {len(user_trades) - num}개 거래는 표시되지 않습니다.")
+            break
+        embed.add_field(name=name, value=value, inline=False)
     return embed
 
 # ============== 등록 UI ==============
@@ -178,6 +294,7 @@ class UnitSelectView(View):
         super().__init__(timeout=60)
 
     @discord.ui.button(label="🪙 sats로 거래", style=discord.ButtonStyle.primary)
+    @timed(handler_seconds, "view")
     async def sats_button(self, interaction: discord.Interaction, button):
         await interaction.response.edit_message(
             embed=discord.Embed(title="📋 거래 유형 선택", description="판매 / 구매를 선택해주세요:", color=discord.Color.blue()),
@@ -185,6 +302,7 @@ class UnitSelectView(View):
         )
 
     @discord.ui.button(label="💵 원으로 거래", style=discord.ButtonStyle.success)
+    @timed(handler_seconds, "view")
     async def won_button(self, interaction: discord.Interaction, button):
         await interaction.response.edit_message(
             embed=discord.Embed(title="📋 거래 유형 선택", description="판매 / 구매를 선택해주세요:", color=discord.Color.blue()),
@@ -197,6 +315,7 @@ class TradeTypeView(View):
         self.unit = unit
 
     @discord.ui.button(label="🔴 판매", style=discord.ButtonStyle.danger)
+    @timed(handler_seconds, "view")
     async def sell_button(self, interaction: discord.Interaction, button):
         await interaction.response.edit_message(
             embed=discord.Embed(title="⚡ 거래 방식 선택", description="라이트닝 / 온체인을 선택해주세요:", color=discord.Color.blue()),
@@ -204,6 +323,7 @@ class TradeTypeView(View):
         )
 
     @discord.ui.button(label="🟢 구매", style=discord.ButtonStyle.success)
+    @timed(handler_seconds, "view")
     async def buy_button(self, interaction: discord.Interaction, button):
         await interaction.response.edit_message(
             embed=discord.Embed(title="⚡ 거래 방식 선택", description="라이트닝 / 온체인을 선택해주세요:", color=discord.Color.blue()),
@@ -217,10 +337,12 @@ class MethodSelectView(View):
         self.trade_type = trade_type
 
     @discord.ui.button(label="⚡ 라이트닝", style=discord.ButtonStyle.primary)
+    @timed(handler_seconds, "view")
     async def lightning_button(self, interaction: discord.Interaction, button):
         await interaction.response.send_modal(TradeModal(self.unit, self.trade_type, "라이트닝"))
 
     @discord.ui.button(label="🔗 온체인", style=discord.ButtonStyle.secondary)
+    @timed(handler_seconds, "view")
     async def onchain_button(self, interaction: discord.Interaction, button):
         await interaction.response.send_modal(TradeModal(self.unit, self.trade_type, "온체인"))
 
@@ -238,6 +360,8 @@ class TradeModal(Modal):
         for item in [self.amount, self.premium, self.note]:
             self.add_item(item)
 
+    @timed(handler_seconds, "modal")
+    @outbound.guard()
     async def on_submit(self, interaction: discord.Interaction):
         result, error_msg = validate_trade_input(
             self.amount.value,
@@ -247,95 +371,158 @@ class TradeModal(Modal):
         )
         
         if error_msg or result is None:
-            return await interaction.response.send_message(error_msg or "❌ 입력값 검증 실패", ephemeral=True)
+            return await respond(interaction, error_msg or "❌ 입력값 검증 실패", ephemeral=True)
         
         amount_num, premium, note_clean = result
         
-        trade = {
-            "user_id": interaction.user.id,
-            "user_name": interaction.user.display_name,
-            "trade_type": self.trade_type,
-            "method": self.method,
-            "unit": self.unit,
-            "amount": amount_num,
-            "amount_formatted": f"{amount_num:,} {self.unit}",
-            "premium": premium,
-            "note": note_clean,
-            "timestamp": datetime.now().isoformat()
-        }
-
-        trades.append(trade)
-        save_trades(trades)
-        await interaction.response.send_message(
-            f"✅ 거래가 등록되었습니다!\n**{self.trade_type}** | {self.method} | {trade['amount_formatted']} | 프리미엄 {premium:+.2f}%",
-            ephemeral=True
+        trade = Trade(
+            guild_id=interaction.guild_id,
+            user_id=interaction.user.id,
+            user_name=interaction.user.display_name,
+            trade_type=self.trade_type,
+            method=self.method,
+            unit=self.unit,
+            amount=amount_num,
+            premium=premium,
+            note=note_clean,
+            expires_at=sweeper.expiry_for(interaction.guild_id, self.trade_type)
         )
 
+        partition = await get_partition(interaction)
+        partition.store.add(trade)
+        await partition.writer.add(trade)
+        message = f"✅ 거래가 등록되었습니다!\n**{self.trade_type}** | {self.method} | {trade.amount_formatted} | 프리미엄 {premium:+.2f}%"
+        counter = partition.matcher.find_match(trade)
+        if counter is not None:
+            message += f"\n\n🤝 가격이 맞는 거래가 있습니다: {describe_trade(counter)} - <@{counter.user_id}>"
+        await respond(interaction, message, ephemeral=True)
+        if counter is not None:
+            notify_match(trade, counter)
+
 # ============== 내 거래 관리 UI ==============
-class MyTradesView(View):
-    def __init__(self, user_id: int):
-        super().__init__(timeout=120)
-        self.user_id = user_id
-        user_trades = get_user_trades(user_id)
-
-        for num, (trade_idx, trade) in enumerate(user_trades[:5]):
-            edit_btn = Button(label=f"수정 {num+1}", style=discord.ButtonStyle.primary, row=num)
-            delete_btn = Button(label=f"삭제 {num+1}", style=discord.ButtonStyle.danger, row=num)
-            edit_btn.callback = self._make_edit_callback(trade_idx)
-            delete_btn.callback = self._make_delete_callback(trade_idx)
-            self.add_item(edit_btn)
-            self.add_item(delete_btn)
-
-    def _make_edit_callback(self, trade_idx):
-        async def callback(interaction: discord.Interaction):
-            if interaction.user.id != self.user_id:
-                return await interaction.response.send_message("❌ 본인의 거래만 수정할 수 있습니다.", ephemeral=True)
-            if trade_idx >= len(trades) or trades[trade_idx]["user_id"] != self.user_id:
-                return await interaction.response.send_message("❌ 거래를 찾을 수 없습니다.", ephemeral=True)
-            trade = trades[trade_idx]
-            await interaction.response.send_message(
-                embed=discord.Embed(title="⚡ 거래 방식 선택", description="변경할 거래 방식을 선택해주세요:", color=discord.Color.blue()),
-                view=EditMethodView(trade_idx, trade.get("unit", "sats")),
-                ephemeral=True
-            )
-        return callback
+# 버튼 custom_id에 거래 id를 담아 두므로 봇이 재시작되어도 기존 메시지의 버튼이 동작함
+class TradeEditButton(discord.ui.DynamicItem[Button], template=r"trade:edit:(?P<id>\d+)"):
+    def __init__(self, trade_id: int, num: int = 1):
+        super().__init__(Button(
+            label=f"수정 {num}", style=discord.ButtonStyle.primary, row=num - 1,
+            custom_id=f"trade:edit:{trade_id}"
+        ))
+        self.trade_id = trade_id
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: Button, match):
+        return cls(int(match["id"]))
+
+    @timed(handler_seconds, "view")
+    @outbound.guard()
+    async def callback(self, interaction: discord.Interaction):
+        trade = (await get_partition(interaction)).store.get(self.trade_id)
+        if trade is None:
+            return await respond(interaction, "❌ 거래를 찾을 수 없습니다.", ephemeral=True)
+        if trade.user_id != interaction.user.id:
+            return await respond(interaction, "❌ 본인의 거래만 수정할 수 있습니다.", ephemeral=True)
+        await respond(
+            interaction,
+            embed=discord.Embed(title="⚡ 거래 방식 선택", description="변경할 거래 방식을 선택해주세요:", color=discord.Color.blue()),
+            view=EditMethodView(self.trade_id, trade.unit),
+            ephemeral=True
+        )
 
-    def _make_delete_callback(self, trade_idx):
-        async def callback(interaction: discord.Interaction):
-            if interaction.user.id != self.user_id:
-                return await interaction.response.send_message("❌ 본인의 거래만 삭제할 수 있습니다.", ephemeral=True)
-            if trade_idx >= len(trades) or trades[trade_idx]["user_id"] != self.user_id:
-                return await interaction.response.send_message("❌ 거래를 찾을 수 없습니다.", ephemeral=True)
-            deleted = trades.pop(trade_idx)
-            save_trades(trades)
-
-            user_trades = get_user_trades(self.user_id)
-            if user_trades:
-                embed = build_my_trades_embed(user_trades)
-                await interaction.response.edit_message(embed=embed, view=MyTradesView(self.user_id))
-            else:
-                embed = discord.Embed(title="📋 내 거래 목록", description="등록된 거래가 없습니다.", color=discord.Color.blue())
-                await interaction.response.edit_message(embed=embed, view=None)
-        return callback
+class TradeDeleteButton(discord.ui.DynamicItem[Button], template=r"trade:delete:(?P<id>\d+)"):
+    def __init__(self, trade_id: int, num: int = 1):
+        super().__init__(Button(
+            label=f"삭제 {num}", style=discord.ButtonStyle.danger, row=num - 1,
+            custom_id=f"trade:delete:{trade_id}"
+        ))
+        self.trade_id = trade_id
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: Button, match):
+        return cls(int(match["id"]))
+
+    @timed(handler_seconds, "view")
+    @outbound.guard(edit=True)
+    async def callback(self, interaction: discord.Interaction):
+        partition = await get_partition(interaction)
+        trade = partition.store.get(self.trade_id)
+        if trade is None:
+            return await respond(interaction, "❌ 거래를 찾을 수 없습니다.", ephemeral=True)
+        if trade.user_id != interaction.user.id:
+            return await respond(interaction, "❌ 본인의 거래만 삭제할 수 있습니다.", ephemeral=True)
+        partition.store.delete(self.trade_id)
+        await partition.writer.delete(self.trade_id)
+
+        user_trades = partition.store.user_trades(interaction.user.id)
+        if user_trades:
+            embed = build_my_trades_embed(user_trades)
+            await respond(interaction, edit=True, embed=embed, view=MyTradesView(user_trades))
+        else:
+            embed = discord.Embed(title="📋 내 거래 목록", description="등록된 거래가 없습니다.", color=discord.Color.blue())
+            await respond(interaction, edit=True, embed=embed, view=None)
+
+# DM에서도 눌리므로 custom_id에 길드 id를 함께 담음
+class TradeBumpButton(discord.ui.DynamicItem[Button], template=r"trade:bump:(?P<guild>\d+):(?P<id>\d+)"):
+    def __init__(self, guild_id: int, trade_id: int, num: int = 1):
+        super().__init__(Button(
+            label=f"연장 {num}", style=discord.ButtonStyle.success, row=num - 1,
+            custom_id=f"trade:bump:{guild_id}:{trade_id}"
+        ))
+        self.guild_id = guild_id
+        self.trade_id = trade_id
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: Button, match):
+        return cls(int(match["guild"]), int(match["id"]))
+
+    @timed(handler_seconds, "view")
+    @outbound.guard()
+    async def callback(self, interaction: discord.Interaction):
+        # DM의 버튼은 0번 샤드로 들어오므로 다른 프로세스가 맡은 길드(또는 봇이 나간 길드)일 수 있음
+        if client.get_guild(self.guild_id) is None:
+            return await respond(interaction, "❌ 여기서는 이 거래를 연장할 수 없습니다. 거래를 등록한 서버에서 `/내거래`로 연장해주세요.", ephemeral=True)
+        partition = await partitions.acquire(self.guild_id)
+        trade = partition.store.get(self.trade_id)
+        if trade is None:
+            return await respond(interaction, "❌ 거래를 찾을 수 없습니다. 이미 만료되었거나 삭제되었습니다.", ephemeral=True)
+        if trade.user_id != interaction.user.id:
+            return await respond(interaction, "❌ 본인의 거래만 연장할 수 있습니다.", ephemeral=True)
+        expires_at = sweeper.expiry_for(self.guild_id, trade.trade_type)
+        if expires_at is None:
+            return await respond(interaction, "ℹ️ 이 서버의 거래는 만료되지 않습니다.", ephemeral=True)
+        fields = {"expires_at": expires_at, "expiry_noticed": False}
+        partition.store.update_expiry(self.trade_id, fields)
+        await partition.writer.update(self.trade_id, fields)
+        await respond(interaction, f"✅ 거래 #{self.trade_id}가 연장되었습니다. (만료: <t:{expires_at}:R>)", ephemeral=True)
+
+class MyTradesView(View):
+    def __init__(self, user_trades):
+        super().__init__(timeout=None)
+        for num, trade in enumerate(user_trades[:5], start=1):
+            self.add_item(TradeEditButton(trade.id, num))
+            self.add_item(TradeDeleteButton(trade.id, num))
+            if trade.expires_at:
+                self.add_item(TradeBumpButton(trade.guild_id, trade.id, num))
 
 class EditMethodView(View):
-    def __init__(self, trade_idx: int, unit: str):
+    def __init__(self, trade_id: int, unit: str):
         super().__init__(timeout=60)
-        self.trade_idx = trade_idx
+        self.trade_id = trade_id
         self.unit = unit
 
     @discord.ui.button(label="⚡ 라이트닝", style=discord.ButtonStyle.primary)
+    @timed(handler_seconds, "view")
     async def lightning_button(self, interaction: discord.Interaction, button):
-        await interaction.response.send_modal(EditModal(self.trade_idx, self.unit, "라이트닝"))
+        await interaction.response.send_modal(EditModal(self.trade_id, self.unit, "라이트닝"))
 
     @discord.ui.button(label="🔗 온체인", style=discord.ButtonStyle.secondary)
+    @timed(handler_seconds, "view")
     async def onchain_button(self, interaction: discord.Interaction, button):
-        await interaction.response.send_modal(EditModal(self.trade_idx, self.unit, "온체인"))
+        await interaction.response.send_modal(EditModal(self.trade_id, self.unit, "온체인"))
 
 class EditModal(Modal):
-    def __init__(self, trade_index: int, current_unit: str, method: str):
+    def __init__(self, trade_id: int, current_unit: str, method: str):
         super().__init__(title=f"거래 수정 ({current_unit})")
-        self.trade_index = trade_index
+        self.trade_id = trade_id
         self.unit = current_unit
         self.method = method
 
@@ -346,6 +533,8 @@ class EditModal(Modal):
         for item in [self.amount, self.premium, self.note]:
             self.add_item(item)
 
+    @timed(handler_seconds, "modal")
+    @outbound.guard()
     async def on_submit(self, interaction: discord.Interaction):
         result, error_msg = validate_trade_input(
             self.amount.value,
@@ -355,127 +544,416 @@ class EditModal(Modal):
         )
         
         if error_msg or result is None:
-            return await interaction.response.send_message(error_msg or "❌ 입력값 검증 실패", ephemeral=True)
+            return await respond(interaction, error_msg or "❌ 입력값 검증 실패", ephemeral=True)
         
         amount_num, premium, note_clean = result
 
-        if 0 <= self.trade_index < len(trades):
-            trades[self.trade_index].update({
+        partition = await get_partition(interaction)
+        trade = partition.store.get(self.trade_id)
+        if trade is not None and trade.user_id == interaction.user.id:
+            fields = {
                 "method": self.method,
                 "amount": amount_num,
-                "amount_formatted": f"{amount_num:,} {self.unit}",
                 "premium": premium,
                 "note": note_clean,
-                "timestamp": datetime.now().isoformat()
-            })
-            save_trades(trades)
-            await interaction.response.send_message("✅ 거래 정보가 수정되었습니다!", ephemeral=True)
+                "timestamp": int(time.time())
+            }
+            partition.store.update(self.trade_id, fields)
+            await partition.writer.update(self.trade_id, fields)
+            await respond(interaction, "✅ 거래 정보가 수정되었습니다!", ephemeral=True)
         else:
-            await interaction.response.send_message("❌ 거래를 찾을 수 없습니다.", ephemeral=True)
+            await respond(interaction, "❌ 거래를 찾을 수 없습니다.", ephemeral=True)
+
+# ============== 전광판 UI ==============
+# custom_id에 이동할 (판매/구매, 페이지)를 담아 두므로 뷰 상태 없이 재시작 후에도 동작함
+class BoardPageButton(discord.ui.DynamicItem[Button], template=r"board:(?P<side>sell|buy):(?P<page>\d+):(?P<role>\w+)"):
+    def __init__(self, side: str, page: int, role: str, label: str = "", style=discord.ButtonStyle.secondary, disabled=False):
+        super().__init__(Button(
+            label=label, style=style, disabled=disabled,
+            custom_id=f"board:{SIDE_KEYS[side]}:{page}:{role}"
+        ))
+        self.side = side
+        self.page = page
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: Button, match):
+        return cls(SIDES_BY_KEY[match["side"]], int(match["page"]), match["role"])
+
+    @timed(handler_seconds, "view")
+    @outbound.guard(edit=True)
+    async def callback(self, interaction: discord.Interaction):
+        if oracle is not None:
+            await oracle.get()
+        board = (await get_partition(interaction)).board
+        embed, page = board.page_embed(self.side, self.page)
+        if live_board.is_live_message(interaction.message):
+            # 고정 전광판은 모두가 보는 메시지이므로 눌렀을 때는 본인에게만 보이는 사본으로 응답
+            return await respond(interaction, embed=embed, view=BoardView(self.side, page, board.page_count(self.side)), ephemeral=True)
+        await respond(interaction, edit=True, embed=embed, view=BoardView(self.side, page, board.page_count(self.side)))
+
+class BoardView(View):
+    def __init__(self, side: str, page: int, count: int = 1):
+        super().__init__(timeout=None)
+        self.add_item(BoardPageButton(side, max(page - 1, 0), "prev", "◀ 이전", disabled=page <= 0))
+        self.add_item(BoardPageButton(side, page + 1, "next", "다음 ▶", disabled=page >= count - 1))
+        for other in TRADE_TYPES:
+            style = discord.ButtonStyle.primary if other == side else discord.ButtonStyle.secondary
+            self.add_item(BoardPageButton(other, 0, "side", SIDE_LABELS[other], style=style))
+
+# ============== 전광판 검색 UI ==============
+# 검색 조건은 custom_id에 다 담을 수 없으므로 View가 조건을 들고 있다가 버튼을 누르면 다시 검색한다.
+async def search_board(partition, query, page=0):
+    if oracle is not None:
+        await oracle.get()
+    trades = partition.search.search(query)
+    embed, page, count = partition.board.filtered_embed(query.side, trades, page, f"🔎 {query.describe()}")
+    return embed, SearchView(query, page, count)
+
+class SearchView(View):
+    def __init__(self, query: TradeQuery, page: int, count: int):
+        super().__init__(timeout=600)
+        self.add_item(self._button("◀ 이전", query, page - 1, disabled=page <= 0))
+        self.add_item(self._button("다음 ▶", query, page + 1, disabled=page >= count - 1))
+        for other in TRADE_TYPES:
+            style = discord.ButtonStyle.primary if other == query.side else discord.ButtonStyle.secondary
+            self.add_item(self._button(SIDE_LABELS[other], query.with_side(other), 0, style=style))
+
+    @staticmethod
+    def _button(label, query, page, style=discord.ButtonStyle.secondary, disabled=False):
+        button = Button(label=label, style=style, disabled=disabled)
+
+        @timed(handler_seconds, "view", name="SearchView.page")
+        @outbound.guard(name="SearchView.page", edit=True)
+        async def callback(interaction: discord.Interaction):
+            embed, view = await search_board(await get_partition(interaction), query, page)
+            await respond(interaction, edit=True, embed=embed, view=view)
+
+        button.callback = callback
+        return button
 
 # ============== 슬래시 명령어 ==============
 @checks.cooldown(1, 30.0, key=lambda i: (i.guild_id, i.user.id))
 @tree.command(name="등록", description="새로운 P2P 거래를 등록합니다")
+@app_commands.guild_only()
 async def register_trade(interaction: discord.Interaction):
     embed = discord.Embed(title="💱 거래 단위 선택", description="거래하실 단위를 선택해주세요:", color=discord.Color.blue())
     await interaction.response.send_message(embed=embed, view=UnitSelectView(), ephemeral=True)
 
 @checks.cooldown(1, 10.0, key=lambda i: (i.guild_id, i.user.id))
-@tree.command(name="전광판", description="등록된 P2P 거래 목록을 확인합니다")
-async def show_board(interaction: discord.Interaction):
-    if interaction.channel.name != BOARD_CHANNEL_NAME:
-        return await interaction.response.send_message("❌ 이 명령어는 전광판 채널에서만 사용할 수 있습니다.", ephemeral=True)
-
-    if not trades:
-        return await interaction.response.send_message("📊 등록된 거래가 없습니다.", ephemeral=True)
-
-    sell = sorted([t for t in trades if t["trade_type"] == "판매"], key=lambda x: x["premium"])
-    buy = sorted([t for t in trades if t["trade_type"] == "구매"], key=lambda x: x["premium"])
-
-    embed = discord.Embed(title="📊 비트코인 P2P 전광판", color=discord.Color.gold(), timestamp=datetime.now())
-
-    for name, data in [("🔴 판매", sell), ("🟢 구매", buy)]:
-        if data:
-            text = "\n".join([
-                f"{'⚡' if t['method']=='라이트닝' else '🔗'} <@{t['user_id']}> | {t['amount_formatted']} | +{t['premium']}%{' | '+t['note'] if t.get('note') else ''}"
-                for t in data
-            ])
-            embed.add_field(name=name, value=text, inline=False)
-
-    embed.set_footer(text="판매자를 클릭하면 DM을 보낼 수 있습니다")
-    await interaction.response.send_message(embed=embed)
+@tree.command(name="전광판", description="P2P 전광판으로 이동하거나 조건에 맞는 거래를 검색합니다")
+@app_commands.guild_only()
+@app_commands.describe(
+    종류="판매 / 구매 (기본: 판매)",
+    방식="라이트닝 / 온체인",
+    단위="sats / 원 (수량 조건은 이 단위 기준)",
+    최소수량="최소 수량",
+    최대수량="최대 수량",
+    최소프리미엄="최소 프리미엄 (%)",
+    최대프리미엄="최대 프리미엄 (%)",
+    검색어="비고에 들어 있는 단어 (앞부분 일치)",
+)
+@outbound.guard()
+async def show_board(
+    interaction: discord.Interaction,
+    종류: Optional[Literal["판매", "구매"]] = None,
+    방식: Optional[Literal["라이트닝", "온체인"]] = None,
+    단위: Optional[Literal["sats", "원"]] = None,
+    최소수량: Optional[int] = None,
+    최대수량: Optional[int] = None,
+    최소프리미엄: Optional[float] = None,
+    최대프리미엄: Optional[float] = None,
+    검색어: Optional[str] = None,
+):
+    filters = (방식, 단위, 최소수량, 최대수량, 최소프리미엄, 최대프리미엄, 검색어)
+    if any(value is not None for value in filters):
+        query = TradeQuery(종류 or "판매", 방식, 단위, 최소수량, 최대수량, 최소프리미엄, 최대프리미엄, 검색어)
+        embed, view = await search_board(await get_partition(interaction), query)
+        return await respond(interaction, embed=embed, view=view, ephemeral=True)
+
+    if 종류 is not None:
+        # 조건 없이 종류만 고르면 캐시된 전광판 페이지를 그대로 보여줌
+        if oracle is not None:
+            await oracle.get()
+        board = (await get_partition(interaction)).board
+        embed, page = board.page_embed(종류, 0)
+        return await respond(interaction, embed=embed, view=BoardView(종류, page, board.page_count(종류)), ephemeral=True)
+
+    url = live_board.jump_url(interaction.guild.id)
+    if url is not None:
+        return await respond(interaction, f"📊 전광판: {url}", ephemeral=True)
+
+    # 아직 전광판 메시지가 없으면 새로 만들어 고정
+    await outbound.defer(interaction)
+    message = await live_board.ensure(interaction.guild)
+    if message is None:
+        return await interaction.followup.send(f"❌ `{BOARD_CHANNEL_NAME}` 채널을 찾을 수 없습니다.", ephemeral=True)
+    await interaction.followup.send(f"📊 전광판: {message.jump_url}", ephemeral=True)
+
+# 자동완성은 이미 입력한 종류/방식/단위에 해당하는 인덱스 버킷에서만 값을 고름
+def _search_scope(interaction: discord.Interaction):
+    """(검색 인덱스, 범위). 자동완성은 defer할 수 없으므로 길드 거래를 아직 불러오는 중이면 (None, 범위)"""
+    ns = interaction.namespace
+    partition = partitions.ready(interaction.guild_id)
+    return partition.search if partition is not None else None, (ns.종류 or "판매", ns.방식, ns.단위)
+
+@show_board.autocomplete("검색어")
+async def keyword_autocomplete(interaction: discord.Interaction, current: str):
+    # 마지막 단어만 완성
+    index, _ = _search_scope(interaction)
+    if index is None:
+        return []
+    head, _, last = current.rpartition(" ")
+    prefix = head + " " if head else ""
+    return [
+        app_commands.Choice(name=f"{prefix}{term} ({index.term_count(term)}건)"[:100], value=f"{prefix}{term}"[:100])
+        for term in index.terms(last)
+    ]
+
+@show_board.autocomplete("최소수량")
+@show_board.autocomplete("최대수량")
+async def amount_autocomplete(interaction: discord.Interaction, current: int):
+    index, scope = _search_scope(interaction)
+    if index is None:
+        return []
+    return [app_commands.Choice(name=f"{value:,}", value=value) for value in index.amount_points(*scope)]
+
+@show_board.autocomplete("최소프리미엄")
+@show_board.autocomplete("최대프리미엄")
+async def premium_autocomplete(interaction: discord.Interaction, current: float):
+    index, scope = _search_scope(interaction)
+    if index is None:
+        return []
+    return [app_commands.Choice(name=f"{value:+g}%", value=value) for value in index.premium_points(*scope)]
 
 @checks.cooldown(1, 15.0, key=lambda i: (i.guild_id, i.user.id))
 @tree.command(name="내거래", description="내가 등록한 거래를 확인/수정/삭제합니다")
+@app_commands.guild_only()
+@outbound.guard()
 async def my_trades_cmd(interaction: discord.Interaction):
-    user_trades = get_user_trades(interaction.user.id)
+    user_trades = (await get_partition(interaction)).store.user_trades(interaction.user.id)
 
     if not user_trades:
-        return await interaction.response.send_message("📋 등록한 거래가 없습니다.", ephemeral=True)
+        return await respond(interaction, "📋 등록한 거래가 없습니다.", ephemeral=True)
 
     embed = build_my_trades_embed(user_trades)
-    await interaction.response.send_message(embed=embed, view=MyTradesView(interaction.user.id), ephemeral=True)
+    await respond(interaction, embed=embed, view=MyTradesView(user_trades), ephemeral=True)
 
 # ============== 관리자 명령어 ==============
 @tree.command(name="전체삭제", description="[관리자] 모든 거래를 삭제합니다")
+@app_commands.guild_only()
+@outbound.guard()
 async def delete_all(interaction: discord.Interaction):
     if not is_admin_or_helper(interaction.user):
-        return await interaction.response.send_message("❌ 관리자 또는 Helper만 사용할 수 있습니다.", ephemeral=True)
+        return await respond(interaction, "❌ 관리자 또는 Helper만 사용할 수 있습니다.", ephemeral=True)
 
-    if not trades:
-        return await interaction.response.send_message("📊 삭제할 거래가 없습니다.", ephemeral=True)
+    partition = await get_partition(interaction)
+    if not partition.store:
+        return await respond(interaction, "📊 삭제할 거래가 없습니다.", ephemeral=True)
 
-    count = len(trades)
-    trades.clear()
-    save_trades(trades)
-    await interaction.response.send_message(f"✅ 총 {count}개의 거래가 삭제되었습니다.", ephemeral=True)
+    count = len(partition.store)
+    partition.store.clear()
+    await partition.writer.clear()
+    await respond(interaction, f"✅ 총 {count}개의 거래가 삭제되었습니다.", ephemeral=True)
 
 @tree.command(name="강제삭제", description="[관리자] 특정 거래를 강제로 삭제합니다")
-@app_commands.describe(번호="전광판에 표시된 순서")
+@app_commands.guild_only()
+@app_commands.describe(번호="전광판에 표시된 거래 번호 (#)")
+@outbound.guard()
 async def force_delete(interaction: discord.Interaction, 번호: int):
     if not is_admin_or_helper(interaction.user):
-        return await interaction.response.send_message("❌ 관리자 또는 Helper만 사용할 수 있습니다.", ephemeral=True)
-
-    if not trades:
-        return await interaction.response.send_message("❌ 삭제할 거래가 없습니다.", ephemeral=True)
+        return await respond(interaction, "❌ 관리자 또는 Helper만 사용할 수 있습니다.", ephemeral=True)
 
-    sell = sorted([t for t in trades if t["trade_type"] == "판매"], key=lambda x: x["premium"])
-    buy = sorted([t for t in trades if t["trade_type"] == "구매"], key=lambda x: x["premium"])
-    all_sorted = sell + buy
+    partition = await get_partition(interaction)
+    if not partition.store:
+        return await respond(interaction, "❌ 삭제할 거래가 없습니다.", ephemeral=True)
 
-    if 번호 < 1 or 번호 > len(all_sorted):
-        return await interaction.response.send_message(f"❌ 올바른 번호를 입력해주세요. (1-{len(all_sorted)})", ephemeral=True)
+    target = partition.store.get(번호)
+    if target is None:
+        return await respond(interaction, f"❌ #{번호} 거래를 찾을 수 없습니다.", ephemeral=True)
 
-    target = all_sorted[번호 - 1]
-    trades.remove(target)
-    save_trades(trades)
-    await interaction.response.send_message(f"✅ 거래가 삭제되었습니다.\n**{target['trade_type']}** | <@{target['user_id']}> | {target['amount_formatted']} | {target['premium']}%", ephemeral=True)
+    partition.store.delete(target.id)
+    await partition.writer.delete(target.id)
+    await respond(interaction, f"✅ 거래가 삭제되었습니다.\n**{target.trade_type}** | <@{target.user_id}> | {target.amount_formatted} | {target.premium}%", ephemeral=True)
 
 @tree.command(name="유저삭제", description="[관리자] 특정 유저의 모든 거래를 삭제합니다")
+@app_commands.guild_only()
 @app_commands.describe(유저="삭제할 유저")
+@outbound.guard()
 async def delete_user_trades(interaction: discord.Interaction, 유저: discord.User):
     if not is_admin_or_helper(interaction.user):
-        return await interaction.response.send_message("❌ 관리자 또는 Helper만 사용할 수 있습니다.", ephemeral=True)
+        return await respond(interaction, "❌ 관리자 또는 Helper만 사용할 수 있습니다.", ephemeral=True)
 
-    user_trades = [t for t in trades if t["user_id"] == 유저.id]
+    partition = await get_partition(interaction)
+    user_trades = partition.store.delete_user(유저.id)
     if not user_trades:
-        return await interaction.response.send_message(f"❌ {유저.display_name}님의 거래가 없습니다.", ephemeral=True)
+        return await respond(interaction, f"❌ {유저.display_name}님의 거래가 없습니다.", ephemeral=True)
 
     count = len(user_trades)
-    for t in user_trades:
-        trades.remove(t)
-    save_trades(trades)
-    await interaction.response.send_message(f"✅ {유저.display_name}님의 거래 {count}개가 삭제되었습니다.", ephemeral=True)
+    await partition.writer.delete_many([t.id for t in user_trades])
+    await respond(interaction, f"✅ {유저.display_name}님의 거래 {count}개가 삭제되었습니다.", ephemeral=True)
+
+@tree.command(name="통계", description="[관리자] 거래 수와 전광판 캐시 상태를 확인합니다")
+@app_commands.guild_only()
+@outbound.guard()
+async def show_stats(interaction: discord.Interaction):
+    if not is_admin_or_helper(interaction.user):
+        return await respond(interaction, "❌ 관리자 또는 Helper만 사용할 수 있습니다.", ephemeral=True)
+
+    partition = await get_partition(interaction)
+    stats = partition.board.stats()
+    await respond(
+        interaction,
+        f"📈 판매 {len(partition.store.side('판매'))}개 | 구매 {len(partition.store.side('구매'))}개\n"
+        f"전광판 캐시: hit {stats['hits']} / miss {stats['misses']} | 캐시된 줄 {stats['cached_lines']}개\n"
+        f"발신: 보냄 {outbound.sent} / 대기 {outbound.pending} / 교체 {outbound.dropped} / 실패 {outbound.failed} | 자동 defer {outbound.deferred}회",
+        ephemeral=True
+    )
+
+@tree.command(name="매칭", description="[관리자] 가격이 맞는 판매/구매 거래 쌍을 확인합니다")
+@app_commands.guild_only()
+@outbound.guard()
+async def show_matches(interaction: discord.Interaction):
+    if not is_admin_or_helper(interaction.user):
+        return await respond(interaction, "❌ 관리자 또는 Helper만 사용할 수 있습니다.", ephemeral=True)
+
+    report = (await get_partition(interaction)).matcher.report()
+    if not report:
+        return await respond(interaction, "📭 가격이 맞는 거래가 없습니다.", ephemeral=True)
+
+    embed = discord.Embed(title="🤝 매칭 가능한 거래", color=0x2ECC71)
+    for (method, unit), pairs in list(report.items())[:25]:
+        lines = [
+            f"판매 #{sell.id} {sell.premium:+.2f}% ({sell.amount:,}) ↔ 구매 #{buy.id} {buy.premium:+.2f}% ({buy.amount:,})"
+            for sell, buy in pairs
+        ]
+        embed.add_field(name=f"{method} | {unit}", value="\n".join(lines)[:1024], inline=False)
+    await respond(interaction, embed=embed, ephemeral=True)
+
+@tree.command(name="프로파일", description="[관리자] 이벤트 루프 샘플링 프로파일러를 시작/중지합니다")
+@app_commands.guild_only()
+@app_commands.describe(동작="시작 / 중지 (중지하면 결과 파일을 보냄)")
+async def toggle_profiler(interaction: discord.Interaction, 동작: Literal["시작", "중지"]):
+    if not is_admin_or_helper(interaction.user):
+        return await interaction.response.send_message("❌ 관리자 또는 Helper만 사용할 수 있습니다.", ephemeral=True)
+
+    if 동작 == "시작":
+        if not profiler.start():
+            return await interaction.response.send_message("⚠️ 프로파일러가 이미 실행 중입니다.", ephemeral=True)
+        return await interaction.response.send_message(
+            f"🔬 프로파일러를 시작했습니다. ({profiler.interval * 1000:g}ms 간격)", ephemeral=True
+        )
+
+    if not profiler.stop():
+        return await interaction.response.send_message("⚠️ 실행 중인 프로파일러가 없습니다.", ephemeral=True)
+    elapsed = time.monotonic() - profiler.started_at
+    lines = [f"`{count:>6}` {name}" for name, count in profiler.top(10)]
+    file = discord.File(io.BytesIO(profiler.collapsed().encode("utf-8")), filename="profile.collapsed.txt")
+    await interaction.response.send_message(
+        f"🔬 {elapsed:.1f}초 동안 샘플 {profiler.samples}개 (collapsed 형식: flamegraph.pl / speedscope)\n" + "\n".join(lines),
+        file=file, ephemeral=True
+    )
 
 # ============== 봇 시작 ==============
+# 시작 단계별 시각(프로세스 시작부터 초): import → 로그인(setup_hook) → 게이트웨이 준비(on_ready) → 거래 로드
+# 명령어 동기화는 게이트웨이 연결과 동시에 진행하므로 따로 잰다.
+startup = {}
+command_sync = None  # 명령어 동기화 Task -> (결과, 걸린 시간)
+
+def mark_startup(phase):
+    startup.setdefault(phase, time.perf_counter() - BOOT)
+
+registry.gauge(
+    "citadel_startup_seconds", "프로세스 시작부터 각 단계가 끝날 때까지 걸린 시간", ("phase",),
+    collect=lambda: [((phase,), seconds) for phase, seconds in startup.items()]
+)
+
+async def startup_report():
+    sync = "건너뜀"
+    if command_sync is not None:
+        try:
+            result, seconds = await command_sync
+            sync = f"{ {'synced': '동기화함', 'unchanged': '변경 없음', 'off': '끔'}[result]} ({seconds:.2f}초)"
+        except discord.HTTPException as e:
+            sync = f"실패 ({e})"
+    parts, previous = [], 0.0
+    for phase, label in (("import", "import"), ("login", "로그인"), ("gateway", "게이트웨이"), ("partitions", "거래 로드")):
+        parts.append(f"{label} {startup[phase] - previous:.2f}초")
+        previous = startup[phase]
+    trades = sum(len(partition.store) for partition in partitions)
+    return (
+        f"🚀 시작 {previous:.2f}초: {' / '.join(parts)} (길드 {len(partitions)}개, 거래 {trades:,}개)\n"
+        f"명령어 동기화: {sync}"
+    )
+
+async def warm_partition(guild_id):
+    """길드 파티션을 미리 불러오고 고정 전광판 갱신 예약"""
+    try:
+        await partitions.acquire(guild_id)
+    except Exception as e:
+        print(f"❌ 길드 {guild_id} 거래 불러오기 실패: {type(e).__name__}: {e}")
+        return
+    live_board.schedule(guild_id)
+
+@client.event
+async def setup_hook():
+    global command_sync
+    mark_startup("login")
+    client.add_dynamic_items(TradeEditButton, TradeDeleteButton, TradeBumpButton, BoardPageButton)
+    compact_journal.start()
+    sweeper.start()
+    outbound.start()
+    if oracle is not None:
+        refresh_price.start()
+    if METRICS_PORT:
+        await metrics_server.start()
+    # 재연결마다 호출되는 on_ready 대신 프로세스당 한 번, 명령어가 바뀐 경우에만 동기화
+    # 여러 프로세스로 샤딩할 때는 0번 샤드를 맡은 프로세스만 (로그인하지 않은 부하 테스트에서는 건너뜀)
+    if client.application_id is not None and (SHARD_IDS is None or 0 in SHARD_IDS):
+        command_sync = asyncio.create_task(sync_commands(
+            tree, os.path.join(DATA_DIR, "command_sync.json"), client.application_id,
+            guild=discord.Object(DEV_GUILD_ID) if DEV_GUILD_ID else None, mode=COMMAND_SYNC
+        ))
+
 @client.event
 async def on_ready():
-    await tree.sync()
+    first = "gateway" not in startup
+    mark_startup("gateway")
+    if LEGACY_GUILD_ID is None and len(client.guilds) == 1:
+        partitions.adopt_legacy(client.guilds[0].id)
+    # 길드 파티션은 스레드에서 동시에 불러옴 (그 사이 들어온 상호작용은 파티션이 준비될 때까지 기다림)
+    await asyncio.gather(*(warm_partition(guild.id) for guild in client.guilds))
     print(f'{client.user} 봇이 준비되었습니다!')
     print(f'서버 수: {len(client.guilds)}')
+    if first:
+        # 시작할 때 불러온 거래는 계속 살아 있으므로 한 번 정리한 뒤 freeze해서 이후 GC가 다시 훑지 않게 함
+        gc.collect()
+        gc.freeze()
+        mark_startup("partitions")
+        print(await startup_report())
+
+async def shutdown():
+    """백그라운드 작업을 멈추고 종료 전 남은 기록을 모두 디스크에 반영"""
+    compact_journal.cancel()
+    sweeper.stop()
+    outbound.stop()
+    profiler.stop()
+    await metrics_server.stop()
+    if oracle is not None:
+        refresh_price.cancel()
+        await oracle.close()
+    await partitions.close_all()
+
+async def main():
+    async with client:
+        try:
+            await client.start(DISCORD_TOKEN)
+        finally:
+            await shutdown()
+
+mark_startup("import")
 
 if __name__ == "__main__":
     if not DISCORD_TOKEN:
         print("❌ DISCORD_TOKEN이 설정되지 않았습니다. .env 파일을 확인하세요.")
         exit(1)
-    client.run(DISCORD_TOKEN)
+    asyncio.run(main())
@@ -0,0 +1,53 @@
+import hashlib
+import json
+import os
+import time
+
+# ============== 명령어 동기화 ==============
+# tree.sync()는 Discord에 명령어 전체를 다시 올리는 REST 호출이고 속도 제한에도 걸리므로,
+# 명령어 정의(JSON)의 해시를 state_file에 남겨 두고 바뀐 경우에만 동기화한다.
+# 해시는 (애플리케이션 id, 범위)별로 저장한다. 범위는 "global" 또는 "guild:<id>" (개발용 길드).
+# 길드에 동기화하면 바로 반영되고, 전역 동기화는 반영까지 시간이 걸릴 수 있다.
+
+
+def tree_hash(tree, guild=None):
+    commands = sorted((command.to_dict(tree) for command in tree.get_commands(guild=guild)), key=lambda c: (c["type"], c["name"]))
+    data = json.dumps(commands, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def _read_state(state_file):
+    try:
+        with open(state_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_state(state_file, state):
+    os.makedirs(os.path.dirname(state_file) or ".", exist_ok=True)
+    tmp_path = state_file + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, state_file)
+
+
+async def sync_commands(tree, state_file, application_id, guild=None, mode="auto"):
+    """명령어가 바뀌었으면 동기화. mode: auto(바뀐 경우만) / always / off
+
+    반환값: (결과, 걸린 시간(초)). 결과는 "synced", "unchanged", "off" 중 하나
+    """
+    start = time.perf_counter()
+    if mode == "off":
+        return "off", 0.0
+    if guild is not None:
+        tree.copy_global_to(guild=guild)
+    key = f"{application_id}:{'global' if guild is None else f'guild:{guild.id}'}"
+    digest = tree_hash(tree, guild)
+    state = _read_state(state_file)
+    if mode != "always" and state.get(key) == digest:
+        return "unchanged", time.perf_counter() - start
+    await tree.sync(guild=guild)
+    state[key] = digest
+    _write_state(state_file, state)
+    return "synced", time.perf_counter() - start
@@ -1,3 +1,4 @@
+import json
 import os
 from dotenv import load_dotenv
 
@@ -8,5 +9,64 @@ DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
 BOARD_CHANNEL_NAME = os.getenv("BOARD_CHANNEL_NAME", "┆🌽ㅣcorn-전광판∶board")
 HELPER_ROLE_NAME = os.getenv("HELPER_ROLE_NAME", "Helper")
 
-# 데이터 파일 경로
-DATA_FILE = "data/trades.json"
+# 명령어 동기화: auto(명령어가 바뀐 경우만) / always / off
+# DEV_GUILD_ID를 지정하면 전역 대신 그 길드에만 동기화 (바로 반영되므로 개발용)
+COMMAND_SYNC = os.getenv("COMMAND_SYNC", "auto")
+DEV_GUILD_ID = int(os.getenv("DEV_GUILD_ID")) if os.getenv("DEV_GUILD_ID") else None
+
+# 샤딩: SHARD_COUNT를 지정하면 AutoShardedClient 사용 ("auto"면 Discord 권장값)
+# 여러 프로세스로 나눌 때는 프로세스마다 SHARD_IDS (예: "0,1")를 지정
+SHARD_COUNT = os.getenv("SHARD_COUNT")
+SHARD_IDS = [int(i) for i in os.getenv("SHARD_IDS", "").split(",") if i.strip()] or None
+# 샤드 id는 전체 샤드 수가 정해져 있어야 의미가 있음 (AutoShardedClient도 shard_count 없이 shard_ids만 받으면 실패)
+if SHARD_IDS and (not SHARD_COUNT or SHARD_COUNT == "auto"):
+    raise ValueError("SHARD_IDS를 지정하려면 SHARD_COUNT에 전체 샤드 수(숫자)를 지정해야 합니다 (auto 불가)")
+
+# 데이터 디렉토리 (길드별 파티션: data/guilds/<guild_id>/) / 저장소 종류 (json: 스냅샷+로그, sqlite: WAL 모드 SQLite)
+DATA_DIR = os.getenv("DATA_DIR", "data")
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "json")
+
+# 길드 구분 이전의 data/trades.json 등을 옮길 길드 (비우면 봇이 속한 길드가 하나일 때 자동 선택)
+LEGACY_GUILD_ID = int(os.getenv("LEGACY_GUILD_ID")) if os.getenv("LEGACY_GUILD_ID") else None
+
+# 저널 압축 기준: 로그 크기(바이트) 또는 주기(초)
+JOURNAL_COMPACT_BYTES = int(os.getenv("JOURNAL_COMPACT_BYTES", 1_000_000))
+JOURNAL_COMPACT_INTERVAL = int(os.getenv("JOURNAL_COMPACT_INTERVAL", 300))
+
+# 기록 방식: group(묶어서 기록, 핸들러는 기다리지 않음) / strict(매 변경 fsync 후 응답)
+PERSIST_DURABILITY = os.getenv("PERSIST_DURABILITY", "group")
+PERSIST_COALESCE_WINDOW = float(os.getenv("PERSIST_COALESCE_WINDOW", 0.2))
+
+# 고정 전광판 메시지: 변경 묶음 대기(초), 최소 수정 간격(초)
+BOARD_EDIT_DEBOUNCE = float(os.getenv("BOARD_EDIT_DEBOUNCE", 3.0))
+BOARD_EDIT_INTERVAL = float(os.getenv("BOARD_EDIT_INTERVAL", 10.0))
+
+# 거래 만료(시간): 판매/구매별 기본값, 길드별 덮어쓰기(JSON, 예: {"123": {"판매": 24}}), 0이면 만료 없음
+TRADE_TTL_HOURS = {
+    "판매": float(os.getenv("TRADE_TTL_SELL_HOURS", 168)),
+    "구매": float(os.getenv("TRADE_TTL_BUY_HOURS", 168)),
+}
+GUILD_TRADE_TTL_HOURS = {int(k): v for k, v in json.loads(os.getenv("GUILD_TRADE_TTL_HOURS", "{}")).items()}
+# 만료 몇 시간 전에 DM으로 연장 안내를 보낼지 (0이면 보내지 않음)
+EXPIRY_NOTICE_HOURS = float(os.getenv("EXPIRY_NOTICE_HOURS", 12))
+
+# BTC/KRW 시세: 공급자(none / upbit / fixed), fixed일 때 가격, 캐시 유지 시간(초)
+# 외부 API(업비트)는 PRICE_PROVIDER=upbit으로 직접 켠 경우에만 호출
+PRICE_PROVIDER = os.getenv("PRICE_PROVIDER", "none")
+PRICE_FIXED_KRW = float(os.getenv("PRICE_FIXED_KRW", 0))
+PRICE_TTL = float(os.getenv("PRICE_TTL", 60))
+# 고정 전광판을 마지막으로 갱신한 시세에서 몇 % 이상 움직였을 때만 시세 때문에 다시 수정할지
+PRICE_BOARD_REFRESH_PCT = float(os.getenv("PRICE_BOARD_REFRESH_PCT", 1.0))
+
+# 주문 매칭: 작은 쪽 수량이 큰 쪽의 몇 배 이상이어야 매칭으로 볼지 (0이면 수량 무관, 예: 0.5)
+MATCH_MIN_AMOUNT_RATIO = float(os.getenv("MATCH_MIN_AMOUNT_RATIO", 0))
+
+# 메트릭: /metrics HTTP 주소와 포트 (0이면 끔), /프로파일 샘플링 간격(초)
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", 0))
+PROFILER_INTERVAL = float(os.getenv("PROFILER_INTERVAL", 0.005))
+
+# 백그라운드 발신 속도(초당 개수): DM / 고정 전광판 수정, 상호작용이 이 시간(초) 안에 응답하지 않으면 자동 defer
+OUTBOUND_DM_RATE = float(os.getenv("OUTBOUND_DM_RATE", 2))
+OUTBOUND_BOARD_RATE = float(os.getenv("OUTBOUND_BOARD_RATE", 0.2))
+AUTO_DEFER_AFTER = float(os.getenv("AUTO_DEFER_AFTER", 2.0))
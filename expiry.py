@@ -0,0 +1,107 @@
+import asyncio
+import heapq
+import time
+
+# ============== 거래 만료 ==============
+# 모든 길드 파티션의 만료 예정 시각을 하나의 힙에 (시각, 종류, guild_id, trade_id, expires_at)로 넣고
+# 작업 하나가 가장 이른 시각까지 잠들었다가 깨어나 처리한다. 거래를 연장/삭제해도 힙에서 바로
+# 지우지 않고, 꺼낼 때 거래의 현재 expires_at과 비교해서 오래된 항목은 버린다 (lazy deletion).
+# 알림 항목은 거래의 expiry_noticed도 확인해서 같은 만료 시각에 한 번만 보낸다.
+# TTL이 알림 시간(notice_before) 이하면 알림 시각이 등록/연장 시점 이전이 되므로 알림 없이 만료만 한다.
+# 종류: "notice"(만료 전 알림) / "expire"(만료 삭제)
+
+
+class ExpirySweeper:
+    def __init__(self, ttl_for, on_notice, on_expire, notice_before=0):
+        """ttl_for(guild_id, trade_type) -> 초 (0이면 만료 없음)
+        on_notice / on_expire: async (partition, trade) 콜백"""
+        self.ttl_for = ttl_for
+        self.on_notice = on_notice
+        self.on_expire = on_expire
+        self.notice_before = notice_before
+        self.partitions = {}
+        self.expired = 0
+        self._heap = []
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def expiry_for(self, guild_id, trade_type, now=None):
+        """새로 등록/연장할 때의 만료 시각 (만료 없으면 None)"""
+        ttl = self.ttl_for(guild_id, trade_type)
+        if not ttl:
+            return None
+        return int((now or time.time()) + ttl)
+
+    # ---------- 추적 ----------
+    def track_partition(self, partition):
+        """파티션을 불러올 때 호출: 기존 거래를 힙에 넣고 이후 변경을 구독"""
+        self.partitions[partition.guild_id] = partition
+        for trade in partition.store:
+            self._push(partition.guild_id, trade)
+        partition.store.listeners.append(lambda op, trade: self._on_change(partition.guild_id, op, trade))
+
+    def _on_change(self, guild_id, op, trade):
+        if op in ("add", "update", "expiry"):
+            self._push(guild_id, trade)
+
+    def _push(self, guild_id, trade):
+        expires_at = trade.expires_at
+        if expires_at is None:
+            return
+        entries = [(expires_at, "expire", guild_id, trade.id, expires_at)]
+        if self._notices(guild_id, trade):
+            entries.append((expires_at - self.notice_before, "notice", guild_id, trade.id, expires_at))
+        for entry in entries:
+            if not self._heap or entry < self._heap[0]:
+                self._wakeup.set()
+            heapq.heappush(self._heap, entry)
+
+    def _notices(self, guild_id, trade):
+        """만료 전 알림을 보낼 거래인지 (TTL이 알림 시간보다 길어야 함)"""
+        if not self.notice_before or trade.expiry_noticed:
+            return False
+        return self.ttl_for(guild_id, trade.trade_type) > self.notice_before
+
+    # ---------- 처리 루프 ----------
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            timeout = None
+            if self._heap:
+                timeout = max(0.0, self._heap[0][0] - time.time())
+            if timeout is None or timeout > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._process_due()
+
+    async def _process_due(self):
+        now = time.time()
+        while self._heap and self._heap[0][0] <= now:
+            when, kind, guild_id, trade_id, expires_at = heapq.heappop(self._heap)
+            partition = self.partitions.get(guild_id)
+            trade = partition.store.get(trade_id) if partition is not None else None
+            if trade is None or trade.expires_at != expires_at:
+                continue  # 이미 삭제되었거나 연장된 거래
+            if kind == "notice" and trade.expiry_noticed:
+                continue  # 수정할 때마다 알림 항목이 추가되므로 이미 알린 거래는 건너뜀
+            try:
+                if kind == "notice":
+                    await self.on_notice(partition, trade)
+                else:
+                    self.expired += 1
+                    await self.on_expire(partition, trade)
+            except Exception as e:
+                import traceback
+                traceback.print_exception(type(e), e, e.__traceback__)
@@ -0,0 +1,524 @@
+"""오프라인 부하 테스트
+
+Discord에 연결하지 않고 가짜 Interaction/User/Guild와 응답 기록기로 실제 명령어 함수와
+View/Modal 핸들러를 한 이벤트 루프에서 동시에 실행한다.
+
+    python loadtest.py --users 50 --duration 10
+    python loadtest.py --users 20 --iterations 30 --mix register=3,delete=1 --json result.json
+    python loadtest.py --script workload.json --max-p99 50
+
+명령어는 CommandTree를 거치지 않고 콜백을 직접 호출하므로 쿨다운/권한 체크는 적용되지 않는다.
+저장소는 임시 디렉토리를 사용하고(기본값), 시세는 고정 시세를 사용한다.
+가짜 응답/DM/메시지 수정은 --rtt초 동안 대기하므로(기본 0: 다른 작업에 차례만 넘김)
+네트워크 왕복 중에 다른 사용자의 핸들러가 실행되는 실제 상황과 같이 번갈아 실행된다.
+"""
+import argparse
+import asyncio
+import importlib
+import itertools
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import discord
+
+from trade import Trade
+
+# ============== 가짜 Discord 객체 ==============
+_ids = itertools.count(10_000)
+RTT = 0.0  # 가짜 REST 호출 왕복 시간(초), main()에서 --rtt로 설정
+
+
+async def _roundtrip():
+    await asyncio.sleep(RTT)
+
+
+class FakeRole:
+    def __init__(self, name):
+        self.name = name
+
+
+class FakePermissions:
+    def __init__(self, administrator=False):
+        self.administrator = administrator
+
+
+class FakeUser:
+    def __init__(self, user_id, name, admin=False):
+        self.id = user_id
+        self.name = name
+        self.display_name = name
+        self.mention = f"<@{user_id}>"
+        self.roles = []
+        self.guild_permissions = FakePermissions(admin)
+        self.dms = []
+
+    async def send(self, content=None, **kwargs):
+        await _roundtrip()
+        self.dms.append(content)
+
+
+class FakeMessage:
+    def __init__(self, channel, content=None, embed=None, view=None):
+        self.id = next(_ids)
+        self.channel = channel
+        self.guild = channel.guild if channel is not None else None
+        self.content = content
+        self.embed = embed
+        self.view = view
+        self.jump_url = f"https://discord.com/channels/0/0/{self.id}"
+
+    async def edit(self, content=None, embed=None, view=None, **kwargs):
+        await _roundtrip()
+        self.content, self.embed, self.view = content, embed, view
+        return self
+
+    async def pin(self):
+        await _roundtrip()
+
+
+class FakeTextChannel:
+    def __init__(self, guild, name):
+        self.id = next(_ids)
+        self.guild = guild
+        self.name = name
+        self.messages = {}
+
+    async def send(self, content=None, embed=None, view=None, **kwargs):
+        await _roundtrip()
+        message = FakeMessage(self, content, embed, view)
+        self.messages[message.id] = message
+        return message
+
+    def get_partial_message(self, message_id):
+        return self.messages[message_id]
+
+
+class FakeGuild:
+    def __init__(self, guild_id, name, board_channel):
+        self.id = guild_id
+        self.name = name
+        self.text_channels = [FakeTextChannel(self, board_channel)]
+
+
+class Recorder:
+    """모든 응답을 세고 Embed가 Discord 제한을 넘는지 확인"""
+
+    def __init__(self):
+        self.calls = {}
+        self.rejected = 0
+        self.violations = []
+
+    def record(self, kind, content=None, embed=None):
+        self.calls[kind] = self.calls.get(kind, 0) + 1
+        if content and content.startswith("❌"):
+            self.rejected += 1
+        if embed is not None:
+            if len(embed) > 6000 or len(embed.fields) > 25 or any(len(f.value or "") > 1024 for f in embed.fields):
+                self.violations.append(f"{embed.title} (필드 {len(embed.fields)}개, {len(embed)}자)")
+
+
+class FakeResponse:
+    def __init__(self, interaction, recorder):
+        self._interaction = interaction
+        self._recorder = recorder
+        self._done = False
+        self.content = None
+        self.embed = None
+        self.view = None
+        self.modal = None
+
+    async def _respond(self, kind, content=None, embed=None, view=None):
+        if self._done:
+            raise discord.InteractionResponded(self._interaction)
+        self._done = True
+        self.content, self.embed, self.view = content, embed, view
+        self._recorder.record(kind, content, embed)
+        await _roundtrip()
+
+    def is_done(self):
+        return self._done
+
+    async def send_message(self, content=None, *, embed=None, view=None, ephemeral=False, **kwargs):
+        await self._respond("send_message", content, embed, view)
+
+    async def edit_message(self, *, content=None, embed=None, view=None, **kwargs):
+        await self._respond("edit_message", content, embed, view)
+
+    async def defer(self, **kwargs):
+        await self._respond("defer")
+
+    async def send_modal(self, modal):
+        await self._respond("send_modal")
+        self.modal = modal
+
+
+class FakeFollowup:
+    def __init__(self, recorder):
+        self._recorder = recorder
+        self.messages = []
+
+    async def send(self, content=None, *, embed=None, view=None, **kwargs):
+        self._recorder.record("followup", content, embed)
+        self.messages.append((content, embed, view))
+        await _roundtrip()
+
+
+class FakeNamespace:
+    def __init__(self, **values):
+        self.__dict__.update(values)
+
+    def __getattr__(self, name):
+        return None
+
+
+class FakeInteraction:
+    def __init__(self, user, guild, recorder, message=None, command=None,
+                 type=discord.InteractionType.application_command, **namespace):
+        self.id = next(_ids)
+        self.type = type
+        self.user = user
+        self.guild = guild
+        self.guild_id = guild.id
+        self.message = message
+        self.command = command
+        self.namespace = FakeNamespace(**namespace)
+        self.extras = {}
+        self.response = FakeResponse(self, recorder)
+        self.followup = FakeFollowup(recorder)
+        self._recorder = recorder
+
+    async def edit_original_response(self, *, content=None, embed=None, view=None, **kwargs):
+        # defer된 응답의 원본 수정: 이후 단계가 이어서 누를 수 있게 응답 내용을 갱신
+        self.response.content, self.response.embed, self.response.view = content, embed, view
+        self._recorder.record("edit_original_response", content, embed)
+        await _roundtrip()
+
+
+# ============== 작업 시나리오 ==============
+# 각 작업은 실제 사용자가 누르는 순서대로 명령어/버튼/모달을 호출한다.
+# 단계마다 걸린 시간을 stats[단계 이름]에 기록한다.
+
+def find_item(view, prefix):
+    """label이 prefix로 시작하는 활성 버튼 (DynamicItem이면 감싼 Button의 label로 비교)"""
+    if view is None:
+        return None
+    for item in view.children:
+        button = getattr(item, "item", item)
+        if (button.label or "").startswith(prefix) and not button.disabled:
+            return item
+    return None
+
+
+class Harness:
+    def __init__(self, bot, guild, rng, recorder):
+        self.bot = bot
+        self.guild = guild
+        self.rng = rng
+        self.recorder = recorder
+        self.stats = {}
+
+    def interaction(self, user, command=None, message=None, type=discord.InteractionType.application_command, **namespace):
+        return FakeInteraction(user, self.guild, self.recorder, message=message, command=command, type=type, **namespace)
+
+    async def step(self, name, coro):
+        start = time.perf_counter()
+        try:
+            await coro
+        except Exception as e:
+            self.stats.setdefault("errors", []).append(f"{name}: {type(e).__name__}: {e}")
+        self.stats.setdefault(name, []).append(time.perf_counter() - start)
+
+    async def command(self, user, name, **kwargs):
+        command = self.bot.tree.get_command(name)
+        inter = self.interaction(user, command=command, **kwargs)
+        await self.step(f"/{name}", command.callback(inter, **kwargs))
+        return inter
+
+    async def click(self, user, view, prefix, name):
+        item = find_item(view, prefix)
+        if item is None:
+            return None
+        inter = self.interaction(user, type=discord.InteractionType.component)
+        await self.step(name, item.callback(inter))
+        return inter
+
+    async def submit(self, user, modal, values, name):
+        inter = self.interaction(user, type=discord.InteractionType.modal_submit)
+        for field, value in values.items():
+            getattr(modal, field)._refresh_state(inter, {"value": value})
+        await self.step(name, modal.on_submit(inter))
+        return inter
+
+    def trade_values(self):
+        rng = self.rng
+        return {
+            "amount": f"{rng.randrange(10_000, 5_000_000, 1_000):,}",
+            "premium": f"{rng.uniform(-3, 8):.1f}",
+            "note": rng.choice(["", "월오사", "스피드 가능", "직거래 서울", "네고 가능 급처", "빠른 응답"]),
+        }
+
+    # ---------- 작업 ----------
+    async def register(self, user):
+        inter = await self.command(user, "등록")
+        inter = await self.click(user, inter.response.view, "🪙" if self.rng.random() < 0.9 else "💵", "UnitSelectView")
+        if inter is None:
+            return
+        inter = await self.click(user, inter.response.view, self.rng.choice(["🔴", "🟢"]), "TradeTypeView")
+        if inter is None:
+            return
+        inter = await self.click(user, inter.response.view, self.rng.choice(["⚡", "🔗"]), "MethodSelectView")
+        if inter is None or inter.response.modal is None:
+            return
+        await self.submit(user, inter.response.modal, self.trade_values(), "TradeModal")
+
+    async def my_trades(self, user):
+        await self.command(user, "내거래")
+
+    async def delete(self, user):
+        inter = await self.command(user, "내거래")
+        await self.click(user, inter.response.view, "삭제", "TradeDeleteButton")
+
+    async def edit(self, user):
+        inter = await self.command(user, "내거래")
+        inter = await self.click(user, inter.response.view, "수정", "TradeEditButton")
+        if inter is None:
+            return
+        inter = await self.click(user, inter.response.view, self.rng.choice(["⚡", "🔗"]), "EditMethodView")
+        if inter is None or inter.response.modal is None:
+            return
+        await self.submit(user, inter.response.modal, self.trade_values(), "EditModal")
+
+    async def bump(self, user):
+        inter = await self.command(user, "내거래")
+        await self.click(user, inter.response.view, "연장", "TradeBumpButton")
+
+    async def board(self, user):
+        inter = await self.command(user, "전광판", 종류=self.rng.choice(["판매", "구매"]))
+        await self.click(user, inter.response.view, "다음", "BoardPageButton")
+
+    async def search(self, user):
+        rng = self.rng
+        filters = rng.choice([
+            {"방식": rng.choice(["라이트닝", "온체인"])},
+            {"최소프리미엄": -1.0, "최대프리미엄": float(rng.randint(0, 5))},
+            {"최소수량": rng.randrange(10_000, 1_000_000, 10_000), "단위": "sats"},
+            {"검색어": rng.choice(["월오", "스피드", "서울", "급처"])},
+        ])
+        inter = await self.command(user, "전광판", 종류=rng.choice(["판매", "구매"]), **filters)
+        await self.click(user, inter.response.view, "다음", "SearchView")
+
+
+ACTIONS = ("register", "my_trades", "delete", "edit", "bump", "board", "search")
+DEFAULT_MIX = {"register": 4, "my_trades": 2, "delete": 1, "edit": 1, "bump": 1, "board": 3, "search": 2}
+
+
+# ============== 실행 ==============
+async def watch_loop(lags, interval, stop):
+    """이벤트 루프 지연 측정: interval만큼 잠들었다 깨어난 시각이 얼마나 늦었는지 기록"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, loop.time() - start - interval))
+
+
+async def run_user(harness, user, actions, deadline, iterations, think):
+    rng = harness.rng
+    for n in itertools.count():
+        if (iterations and n >= iterations) or (deadline and time.perf_counter() >= deadline):
+            break
+        action = next(actions)
+        start = time.perf_counter()
+        await getattr(harness, action)(user)
+        harness.stats.setdefault(f"[{action}]", []).append(time.perf_counter() - start)
+        if think:
+            await asyncio.sleep(rng.uniform(0, 2 * think))
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def summarize(stats, lags, elapsed, recorder, partition):
+    steps = {}
+    for name, values in stats.items():
+        if name == "errors":
+            continue
+        steps[name] = {
+            "count": len(values),
+            "p50_ms": percentile(values, 0.5) * 1000,
+            "p99_ms": percentile(values, 0.99) * 1000,
+            "max_ms": max(values) * 1000,
+        }
+    interactions = [v for name, values in stats.items() if name != "errors" and not name.startswith("[") for v in values]
+    actions = sum(len(values) for name, values in stats.items() if name.startswith("["))
+    return {
+        "elapsed_s": elapsed,
+        "actions": actions,
+        "interactions": len(interactions),
+        "throughput_per_s": len(interactions) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(interactions, 0.5) * 1000,
+        "p99_ms": percentile(interactions, 0.99) * 1000,
+        "loop_lag_p99_ms": percentile(lags, 0.99) * 1000,
+        "loop_lag_max_ms": max(lags, default=0.0) * 1000,
+        "loop_stall_total_ms": sum(lags) * 1000,
+        "responses": recorder.calls,
+        "rejected": recorder.rejected,
+        "embed_limit_violations": len(recorder.violations),
+        "violations": sorted(set(recorder.violations))[:20],
+        "errors": stats.get("errors", [])[:20],
+        "error_count": len(stats.get("errors", [])),
+        "trades": {side: len(partition.store.side(side)) for side in ("판매", "구매")},
+        "steps": steps,
+    }
+
+
+def print_report(report):
+    print(f"\n⏱️  {report['elapsed_s']:.1f}초 | 작업 {report['actions']}개 | 상호작용 {report['interactions']}개 "
+          f"({report['throughput_per_s']:.0f}/s)")
+    print(f"지연 p50 {report['p50_ms']:.2f}ms | p99 {report['p99_ms']:.2f}ms")
+    print(f"이벤트 루프 지연 p99 {report['loop_lag_p99_ms']:.2f}ms | 최대 {report['loop_lag_max_ms']:.2f}ms | "
+          f"합계 {report['loop_stall_total_ms']:.0f}ms")
+    print(f"응답 {report['responses']} | 거절(❌) {report['rejected']} | Embed 제한 초과 {report['embed_limit_violations']} | "
+          f"예외 {report['error_count']} | 남은 거래 {report['trades']}")
+    print(f"\n{'단계':<24}{'횟수':>8}{'p50(ms)':>10}{'p99(ms)':>10}{'max(ms)':>10}")
+    for name, s in sorted(report["steps"].items()):
+        print(f"{name:<24}{s['count']:>8}{s['p50_ms']:>10.2f}{s['p99_ms']:>10.2f}{s['max_ms']:>10.2f}")
+    for error in report["errors"]:
+        print(f"❗ {error}")
+    for violation in report["violations"]:
+        print(f"❗ Embed 제한 초과: {violation}")
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ACTIONS:
+            raise SystemExit(f"알 수 없는 작업: {name} (가능: {', '.join(ACTIONS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+async def run(args):
+    # bot/config는 환경 변수를 읽으므로 설정 후에 불러옴
+    bot = importlib.import_module("bot")
+    rng = random.Random(args.seed)
+    guild = FakeGuild(args.guild_id, "loadtest", bot.BOARD_CHANNEL_NAME)
+    users = [FakeUser(next(_ids), f"user{n}") for n in range(args.users)]
+    users_by_id = {user.id: user for user in users}
+    # DM 발송(매칭/만료 알림)과 고정 전광판 갱신이 가짜 객체를 찾도록 캐시 조회를 대체
+    bot.client.get_user = users_by_id.get
+    bot.client.get_guild = lambda guild_id: guild if guild_id == guild.id else None
+    recorder = Recorder()
+    harness = Harness(bot, guild, rng, recorder)
+
+    await bot.setup_hook()
+    partition = bot.partitions.get(guild.id)
+    for _ in range(args.preload):
+        values = harness.trade_values()
+        user = rng.choice(users)
+        trade_type = rng.choice(["판매", "구매"])
+        trade = Trade(
+            guild_id=guild.id, user_id=user.id, user_name=user.display_name,
+            trade_type=trade_type, method=rng.choice(["라이트닝", "온체인"]), unit="sats",
+            amount=int(values["amount"].replace(",", "")), premium=float(values["premium"]), note=values["note"],
+            expires_at=bot.sweeper.expiry_for(guild.id, trade_type),
+        )
+        partition.store.add(trade)
+        await partition.writer.add(trade)
+
+    if args.script:
+        with open(args.script, 'r', encoding='utf-8') as f:
+            script = json.load(f)
+        unknown = set(script) - set(ACTIONS)
+        if unknown:
+            raise SystemExit(f"알 수 없는 작업: {', '.join(sorted(unknown))}")
+        sequences = [itertools.cycle(script) for _ in users]
+    else:
+        mix = parse_mix(args.mix) if args.mix else DEFAULT_MIX
+        names, weights = list(mix), list(mix.values())
+        sequences = [iter(lambda: rng.choices(names, weights)[0], None) for _ in users]
+
+    lags, stop = [], asyncio.Event()
+    watcher = asyncio.get_running_loop().create_task(watch_loop(lags, args.lag_interval, stop))
+    start = time.perf_counter()
+    deadline = start + args.duration if args.duration and not args.iterations else None
+    await asyncio.gather(*(
+        run_user(harness, user, sequence, deadline, args.iterations, args.think)
+        for user, sequence in zip(users, sequences)
+    ))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await watcher
+
+    report = summarize(harness.stats, lags, elapsed, recorder, partition)
+    await bot.shutdown()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Discord 연결 없이 명령어/View/Modal 핸들러 부하 테스트")
+    parser.add_argument("--users", type=int, default=50, help="동시 사용자 수")
+    parser.add_argument("--duration", type=float, default=10.0, help="실행 시간(초)")
+    parser.add_argument("--iterations", type=int, default=0, help="사용자당 작업 수 (지정하면 --duration 무시)")
+    parser.add_argument("--think", type=float, default=0.0, help="작업 사이 평균 대기 시간(초)")
+    parser.add_argument("--rtt", type=float, default=0.0, help="가짜 Discord 응답 왕복 시간(초)")
+    parser.add_argument("--mix", help="작업 비율, 예: register=4,delete=1,search=2")
+    parser.add_argument("--script", help="사용자마다 반복할 작업 이름 목록(JSON 배열) 파일")
+    parser.add_argument("--preload", type=int, default=1000, help="시작 전에 넣어 둘 거래 수")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--guild-id", type=int, default=1)
+    parser.add_argument("--durability", choices=("group", "strict"), help="PERSIST_DURABILITY 덮어쓰기")
+    parser.add_argument("--backend", choices=("json", "sqlite"), help="STORAGE_BACKEND 덮어쓰기")
+    parser.add_argument("--data-dir", help="저장소 디렉토리 (기본: 임시 디렉토리, 종료 후 삭제)")
+    parser.add_argument("--lag-interval", type=float, default=0.005, help="이벤트 루프 지연 측정 간격(초)")
+    parser.add_argument("--json", help="결과를 JSON으로 저장할 파일")
+    parser.add_argument("--max-p99", type=float, help="전체 p99(ms)가 이 값을 넘으면 종료 코드 1")
+    args = parser.parse_args()
+
+    global RTT
+    RTT = args.rtt
+
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix="citadel-loadtest-")
+    os.environ["DATA_DIR"] = data_dir
+    os.environ["PRICE_PROVIDER"] = "fixed"
+    os.environ.setdefault("PRICE_FIXED_KRW", "100000000")
+    os.environ["METRICS_PORT"] = "0"
+    os.environ["SHARD_COUNT"] = ""
+    os.environ["SHARD_IDS"] = ""
+    os.environ["LEGACY_GUILD_ID"] = ""
+    os.environ.setdefault("BOARD_EDIT_DEBOUNCE", "0.5")
+    os.environ.setdefault("BOARD_EDIT_INTERVAL", "1.0")
+    if args.durability:
+        os.environ["PERSIST_DURABILITY"] = args.durability
+    if args.backend:
+        os.environ["STORAGE_BACKEND"] = args.backend
+
+    try:
+        report = asyncio.run(run(args))
+    finally:
+        if not args.data_dir:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    failed = report["error_count"] or report["embed_limit_violations"]
+    if args.max_p99 is not None and report["p99_ms"] > args.max_p99:
+        print(f"❌ p99 {report['p99_ms']:.2f}ms > {args.max_p99}ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+from bisect import bisect_left
+
+# ============== 주문 매칭 ==============
+# (거래 방식, 단위)별 호가창을 두고 판매는 프리미엄 오름차순, 구매는 프리미엄 내림차순으로
+# 정렬해 둔다. 새 주문이 들어오면 반대편 호가창의 맨 앞(가장 좋은 가격)부터 가격이 맞는
+# 구간만 확인하므로 O(log N) + 수량이 맞지 않아 건너뛴 개수만큼의 비용이 든다.
+# 가격 조건: 판매 프리미엄 <= 구매 프리미엄
+# 수량 조건: 작은 쪽 수량이 큰 쪽의 min_amount_ratio 이상 (0이면 수량 무관)
+
+OPPOSITE = {"판매": "구매", "구매": "판매"}
+
+
+class MatchingEngine:
+    def __init__(self, store, min_amount_ratio=0.0, scan_limit=32):
+        self.store = store
+        self.min_amount_ratio = min_amount_ratio
+        self.scan_limit = scan_limit
+        self._books = {}  # (method, unit) -> {side: (keys, trades)}
+        self._keys = {}  # trade_id -> (book, side, key)
+        self._build(store)
+        store.listeners.append(self._on_change)
+
+    def _build(self, trades):
+        # 처음 불러올 때는 한 번에 정렬 (하나씩 insort하면 O(N²))
+        entries = {}
+        for trade in trades:
+            book_key, side, key = self._book_key(trade), trade.trade_type, self._sort_key(trade)
+            entries.setdefault((book_key, side), []).append((key, trade))
+            self._keys[trade.id] = (book_key, side, key)
+        for (book_key, side), items in entries.items():
+            items.sort(key=lambda item: item[0])
+            book = self._books.setdefault(book_key, {"판매": ([], []), "구매": ([], [])})
+            book[side] = ([key for key, _ in items], [trade for _, trade in items])
+
+    def _on_change(self, op, trade):
+        if op == "expiry":
+            return
+        if op == "clear":
+            self._books.clear()
+            self._keys.clear()
+            return
+        if trade.id in self._keys:
+            self._remove(trade.id)
+        if op in ("add", "update"):
+            self._insert(trade)
+
+    # ---------- 호가창 ----------
+    @staticmethod
+    def _book_key(trade):
+        return trade.method, trade.unit
+
+    @staticmethod
+    def _sort_key(trade):
+        # 앞쪽일수록 상대에게 유리한 가격: 판매는 낮은 프리미엄, 구매는 높은 프리미엄 (같으면 먼저 등록된 순)
+        premium = trade.premium
+        return (premium if trade.trade_type == "판매" else -premium, trade.id)
+
+    def _insert(self, trade):
+        book_key = self._book_key(trade)
+        side = trade.trade_type
+        key = self._sort_key(trade)
+        book = self._books.setdefault(book_key, {"판매": ([], []), "구매": ([], [])})
+        keys, trades = book[side]
+        pos = bisect_left(keys, key)
+        keys.insert(pos, key)
+        trades.insert(pos, trade)
+        self._keys[trade.id] = (book_key, side, key)
+
+    def _remove(self, trade_id):
+        book_key, side, key = self._keys.pop(trade_id)
+        keys, trades = self._books[book_key][side]
+        pos = bisect_left(keys, key)
+        del keys[pos]
+        del trades[pos]
+
+    # ---------- 매칭 ----------
+    def _crosses(self, sell_premium, buy_premium):
+        return sell_premium <= buy_premium
+
+    def _amount_ok(self, a, b):
+        if not self.min_amount_ratio:
+            return True
+        return min(a, b) >= self.min_amount_ratio * max(a, b)
+
+    def find_match(self, trade):
+        """trade와 가격/수량이 맞는 가장 좋은 반대편 주문 (없으면 None)"""
+        book = self._books.get(self._book_key(trade))
+        if book is None:
+            return None
+        side = trade.trade_type
+        _, counters = book[OPPOSITE[side]]
+        for counter in counters[:self.scan_limit]:
+            sell, buy = (trade, counter) if side == "판매" else (counter, trade)
+            if not self._crosses(sell.premium, buy.premium):
+                break  # 정렬되어 있으므로 이후 주문도 가격이 맞지 않음
+            if counter.user_id == trade.user_id:
+                continue
+            if self._amount_ok(trade.amount, counter.amount):
+                return counter
+        return None
+
+    def report(self, limit=10):
+        """호가창별로 가격이 교차하는 (판매, 구매) 쌍 목록. 각 주문은 한 번만 짝지음"""
+        result = {}
+        for book_key, book in self._books.items():
+            sells, buys = book["판매"][1], book["구매"][1]
+            pairs, used = [], set()
+            for sell in sells:
+                if len(pairs) >= limit or not buys or not self._crosses(sell.premium, buys[0].premium):
+                    break
+                for buy in buys[:self.scan_limit]:
+                    if not self._crosses(sell.premium, buy.premium):
+                        break
+                    if buy.id in used or buy.user_id == sell.user_id:
+                        continue
+                    if self._amount_ok(sell.amount, buy.amount):
+                        pairs.append((sell, buy))
+                        used.add(buy.id)
+                        break
+            if pairs:
+                result[book_key] = pairs
+        return result
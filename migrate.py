@@ -0,0 +1,22 @@
+"""길드별 JSON 저장소(data/guilds/<guild_id>/trades.json + 로그/백업)의 거래를 SQLite로 한 번에 옮기는 스크립트
+
+사용법: python migrate.py
+"""
+import os
+from config import DATA_DIR
+from storage import migrate_json_to_sqlite
+
+if __name__ == "__main__":
+    guilds_dir = os.path.join(DATA_DIR, "guilds")
+    if not os.path.isdir(guilds_dir):
+        print(f"❌ {guilds_dir} 디렉토리가 없습니다. 봇을 한 번 실행해 기존 데이터를 길드 파티션으로 옮긴 후 다시 실행하세요.")
+        exit(1)
+    for guild_id in sorted(os.listdir(guilds_dir)):
+        guild_dir = os.path.join(guilds_dir, guild_id)
+        data_file = os.path.join(guild_dir, "trades.json")
+        db_file = os.path.join(guild_dir, "trades.db")
+        if os.path.exists(db_file):
+            print(f"⏭️ {db_file} 파일이 이미 있어 건너뜁니다.")
+            continue
+        count = migrate_json_to_sqlite(data_file, db_file)
+        print(f"✅ 길드 {guild_id}: 거래 {count}개를 {db_file}로 옮겼습니다.")
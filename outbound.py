@@ -0,0 +1,192 @@
+import asyncio
+import functools
+import itertools
+import time
+
+# ============== 발신 스케줄러 ==============
+# 백그라운드 발신(매칭/만료 DM, 고정 전광판 수정)을 한 곳에서 내보낸다.
+#   - 경로(route)별 토큰 버킷으로 Discord 경로별 제한보다 느리게 보냄 (429 재시도는 discord.py가 처리)
+#   - 우선순위 큐: 숫자가 작을수록 먼저 (DM 알림 > 전광판 수정)
+#   - 같은 key로 아직 보내지 않은 작업이 있으면 새 작업으로 교체 (오래된 전광판 수정은 버림)
+#   - 처리 중인 상호작용(핸들러)이 있으면 잠시 기다렸다가 보냄: 상호작용 응답은 3초 안에 해야 하므로
+#     같은 이벤트 루프/HTTP 연결을 쓰는 백그라운드 발신이 앞서지 않게 함
+#
+# 상호작용 핸들러는 @outbound.guard로 감싸면 핸들러별 처리 시간(EWMA)으로 3초를 넘을지 예측해서
+# 미리 defer하고, 예측이 빗나가도 defer_after초 안에 응답하지 않으면 그때 defer한다.
+# 감싼 핸들러는 첫 응답을 respond()로 보내야 defer된 경우 followup/원본 수정으로 바뀐다.
+
+PRIORITY_NOTICE = 1
+PRIORITY_BOARD = 2
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def delay(self):
+        """토큰 하나를 쓸 수 있을 때까지 남은 시간 (0이면 지금 사용 가능)"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+
+class OutboundScheduler:
+    def __init__(self, routes, workers=2, foreground_wait=1.0, defer_after=2.0, predict_threshold=1.5):
+        """routes: {경로 종류: (초당 개수, 최대 몰아쓰기)}. 경로는 (종류, id) 튜플"""
+        self.routes = routes
+        self.workers = workers
+        self.foreground_wait = foreground_wait
+        self.defer_after = defer_after
+        self.predict_threshold = predict_threshold
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+        self.deferred = 0
+        self.foreground = 0
+        self.estimates = {}  # 핸들러 이름 -> 처리 시간 EWMA(초)
+        self._buckets = {}
+        self._queue = asyncio.PriorityQueue()
+        self._pending = {}  # key -> 대기 중인 작업
+        self._order = itertools.count()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._tasks = []
+
+    def start(self):
+        if not self._tasks:
+            loop = asyncio.get_running_loop()
+            self._tasks = [loop.create_task(self._run()) for _ in range(self.workers)]
+
+    def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    @property
+    def pending(self):
+        return self._queue.qsize()
+
+    # ---------- 백그라운드 발신 ----------
+    def submit(self, factory, route, priority=PRIORITY_NOTICE, key=None):
+        """factory()가 반환하는 코루틴을 route 제한에 맞춰 실행. 같은 key의 대기 작업은 교체"""
+        job = [factory, route, key, False]  # 마지막 값: 교체되어 취소됨
+        if key is not None:
+            previous = self._pending.get(key)
+            if previous is not None:
+                previous[3] = True
+                self.dropped += 1
+            self._pending[key] = job
+        self._queue.put_nowait((priority, next(self._order), job))
+
+    def _bucket(self, route):
+        bucket = self._buckets.get(route)
+        if bucket is None:
+            rate, capacity = self.routes.get(route[0], (1.0, 1))
+            bucket = self._buckets[route] = TokenBucket(rate, capacity)
+        return bucket
+
+    async def _run(self):
+        while True:
+            _, _, job = await self._queue.get()
+            factory, route, key, cancelled = job
+            if cancelled:
+                continue
+            # 상호작용 처리 중이면 끝날 때까지 (최대 foreground_wait초) 양보
+            if self.foreground:
+                try:
+                    await asyncio.wait_for(self._idle.wait(), self.foreground_wait)
+                except asyncio.TimeoutError:
+                    pass
+            bucket = self._bucket(route)
+            delay = bucket.delay()
+            while delay > 0:
+                await asyncio.sleep(delay)
+                delay = bucket.delay()
+            bucket.take()
+            if job[3]:
+                continue  # 기다리는 동안 새 작업으로 교체됨
+            if key is not None and self._pending.get(key) is job:
+                del self._pending[key]
+            try:
+                await factory()
+                self.sent += 1
+            except Exception as e:
+                self.failed += 1
+                print(f"발신 실패 ({route[0]}): {type(e).__name__}: {e}")
+
+    # ---------- 상호작용 핸들러 ----------
+    def guard(self, name=None, edit=False):
+        """핸들러를 감싸 처리 중 표시 + 자동 defer. edit=True면 컴포넌트 상호작용을 메시지 수정으로 defer"""
+        def decorator(func):
+            label = name or func.__qualname__
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                interaction = next(arg for arg in args if hasattr(arg, "response"))
+                self.foreground += 1
+                self._idle.clear()
+                start = time.monotonic()
+                watchdog = None
+                if self.estimates.get(label, 0.0) >= self.predict_threshold:
+                    self._defer(interaction, edit)
+                else:
+                    watchdog = asyncio.get_running_loop().call_later(self.defer_after, self._defer, interaction, edit)
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    if watchdog is not None:
+                        watchdog.cancel()
+                    elapsed = time.monotonic() - start
+                    previous = self.estimates.get(label)
+                    self.estimates[label] = elapsed if previous is None else previous * 0.8 + elapsed * 0.2
+                    self.foreground -= 1
+                    if not self.foreground:
+                        self._idle.set()
+            return wrapper
+        return decorator
+
+    async def defer(self, interaction, edit=False):
+        """지금 바로 defer (이미 defer했거나 응답했으면 아무것도 하지 않음)"""
+        self._defer(interaction, edit)
+        deferred = interaction.extras.get("defer")
+        if deferred is not None:
+            await deferred
+
+    def _defer(self, interaction, edit):
+        # "responding": respond()가 첫 응답을 보내는 중 (HTTP 요청이 끝나야 is_done()이 참이 됨)
+        extras = interaction.extras
+        if interaction.response.is_done() or "defer" in extras or "responding" in extras:
+            return
+        self.deferred += 1
+        component = getattr(interaction.type, "name", None) == "component"
+        if component and edit:
+            coro = interaction.response.defer()
+        else:
+            coro = interaction.response.defer(ephemeral=True, thinking=True)
+        extras["defer"] = asyncio.get_running_loop().create_task(coro)
+
+
+async def respond(interaction, content=None, *, edit=False, ephemeral=True, **kwargs):
+    """첫 응답: defer되었으면 followup(edit면 원본 메시지 수정)으로, 아니면 일반 응답으로 보냄"""
+    if content is not None:
+        kwargs["content"] = content
+    deferred = interaction.extras.get("defer")
+    if deferred is None:
+        # 응답 요청이 진행 중일 때 자동 defer가 끼어들어 두 번 응답하지 않도록 먼저 표시
+        interaction.extras["responding"] = True
+        if edit:
+            return await interaction.response.edit_message(**kwargs)
+        return await interaction.response.send_message(ephemeral=ephemeral, **kwargs)
+    await deferred
+    if edit:
+        return await interaction.edit_original_response(**kwargs)
+    if kwargs.get("view", ...) is None:
+        del kwargs["view"]  # followup은 view=None을 받지 않음
+    return await interaction.followup.send(ephemeral=ephemeral, **kwargs)
@@ -0,0 +1,149 @@
+import asyncio
+import os
+import shutil
+import time
+from board import BoardRenderer
+from matching import MatchingEngine
+from search import TradeIndex
+from storage import open_backend, PersistenceWriter
+
+# ============== 길드별 파티션 ==============
+# 길드마다 저장소 파일(data/guilds/<guild_id>/), 거래 저장소, 기록 작업, 전광판 렌더러, 매칭 호가창, 검색 인덱스를
+# 따로 둔다.
+# 파티션은 그 길드에서 처음 사용할 때 불러오므로, 샤드(프로세스)마다 자기가 맡은 길드의 거래만
+# 메모리에 올리고 기록한다.
+# 핸들러는 acquire()로 파티션을 얻는다: 파일 읽기와 인덱스 생성은 스레드에서 하고, 불러오는 중이면
+# 같은 작업이 끝나기를 기다린다 (준비 게이트). 그동안 이벤트 루프는 다른 상호작용에 계속 응답한다.
+
+LEGACY_FILES = ("trades.json", "trades.log", "trades.db", "trades.db-wal", "trades.db-shm", "backups")
+
+
+class GuildPartition:
+    def __init__(self, guild_id, backend, writer, oracle=None, match_amount_ratio=0.0):
+        self.guild_id = guild_id
+        self.backend = backend
+        self.store = backend.store
+        self.writer = writer
+        self.board = BoardRenderer(self.store, oracle)
+        self.matcher = MatchingEngine(self.store, min_amount_ratio=match_amount_ratio)
+        self.search = TradeIndex(self.store)
+
+
+class Partitions:
+    def __init__(self, data_dir, backend_kind, durability="group", coalesce_window=0.2, compact_bytes=None, oracle=None,
+                 match_amount_ratio=0.0):
+        self.data_dir = data_dir
+        self.backend_kind = backend_kind
+        self.durability = durability
+        self.coalesce_window = coalesce_window
+        self.compact_bytes = compact_bytes
+        self.oracle = oracle
+        self.match_amount_ratio = match_amount_ratio
+        self.listeners = []  # (guild_id, op, trade)를 받는 함수
+        self.load_listeners = []  # 파티션을 처음 불러왔을 때 partition을 받는 함수
+        self._partitions = {}
+        self._loading = {}  # guild_id -> 불러오는 중인 Task
+        self.load_seconds = {}  # guild_id -> 불러오는 데 걸린 시간(초)
+
+    def __iter__(self):
+        return iter(list(self._partitions.values()))
+
+    def __len__(self):
+        return len(self._partitions)
+
+    def guild_dir(self, guild_id):
+        return os.path.join(self.data_dir, "guilds", str(guild_id))
+
+    def get(self, guild_id):
+        """길드 파티션을 반환 (처음이면 그 자리에서 불러옴: 이벤트 루프를 막으므로 핸들러에서는 acquire 사용)"""
+        partition = self._partitions.get(guild_id)
+        if partition is None:
+            start = time.perf_counter()
+            partition = self._register(self._open(guild_id), start)
+        return partition
+
+    def ready(self, guild_id):
+        """불러온 길드 파티션 (아직이면 백그라운드에서 불러오기를 시작하고 None: 기다릴 수 없는 자동완성용)"""
+        partition = self._partitions.get(guild_id)
+        if partition is None and guild_id not in self._loading:
+            self._loading[guild_id] = asyncio.get_running_loop().create_task(self._load(guild_id))
+        return partition
+
+    async def acquire(self, guild_id):
+        """길드 파티션을 반환 (처음이면 스레드에서 불러오고, 불러오는 중이면 끝날 때까지 기다림)"""
+        partition = self._partitions.get(guild_id)
+        if partition is not None:
+            return partition
+        task = self._loading.get(guild_id)
+        if task is None:
+            task = self._loading[guild_id] = asyncio.get_running_loop().create_task(self._load(guild_id))
+        return await asyncio.shield(task)
+
+    async def _load(self, guild_id):
+        start = time.perf_counter()
+        try:
+            partition = await asyncio.to_thread(self._open, guild_id)
+        finally:
+            del self._loading[guild_id]
+        existing = self._partitions.get(guild_id)
+        if existing is not None:  # 기다리는 동안 get()으로 이미 불러옴
+            partition.backend.close()
+            return existing
+        return self._register(partition, start)
+
+    def _register(self, partition, start):
+        """불러온 파티션의 기록 작업을 시작하고 load_listeners에 알림 (이벤트 루프에서 호출)"""
+        guild_id = partition.guild_id
+        partition.writer.start()
+        partition.store.listeners.append(lambda op, trade: self._changed(guild_id, op, trade))
+        self._partitions[guild_id] = partition
+        self.load_seconds[guild_id] = time.perf_counter() - start
+        for listener in self.load_listeners:
+            listener(partition)
+        return partition
+
+    def _open(self, guild_id):
+        """저장소를 읽고 전광판/매칭/검색 인덱스를 만듦 (스레드에서 호출 가능: 아직 공유되지 않은 객체만 다룸)"""
+        guild_dir = self.guild_dir(guild_id)
+        kwargs = {} if self.compact_bytes is None else {"compact_bytes": self.compact_bytes}
+        backend = open_backend(
+            self.backend_kind,
+            os.path.join(guild_dir, "trades.json"),
+            os.path.join(guild_dir, "trades.db"),
+            **kwargs
+        )
+        store = backend.load()
+        for trade in store:
+            if trade.guild_id is None:
+                trade.guild_id = guild_id  # 파티션 도입 이전 거래
+
+        writer = PersistenceWriter(backend, durability=self.durability, coalesce_window=self.coalesce_window)
+        return GuildPartition(guild_id, backend, writer, self.oracle, self.match_amount_ratio)
+
+    def _changed(self, guild_id, op, trade):
+        for listener in self.listeners:
+            listener(guild_id, op, trade)
+
+    # ---------- 구버전 데이터 ----------
+    def adopt_legacy(self, guild_id):
+        """길드 구분 없이 data/에 저장된 거래 파일을 guild_id 파티션으로 옮김"""
+        legacy = [name for name in LEGACY_FILES if os.path.exists(os.path.join(self.data_dir, name))]
+        if not legacy or guild_id in self._partitions or guild_id in self._loading:
+            return False
+        guild_dir = self.guild_dir(guild_id)
+        if any(os.path.exists(os.path.join(guild_dir, name)) for name in LEGACY_FILES):
+            print(f"⚠️ {guild_dir}에 이미 데이터가 있어 기존 {', '.join(legacy)} 파일을 옮기지 않았습니다.")
+            return False
+        os.makedirs(guild_dir, exist_ok=True)
+        for name in legacy:
+            shutil.move(os.path.join(self.data_dir, name), os.path.join(guild_dir, name))
+        print(f"📦 기존 거래 데이터를 길드 {guild_id} 파티션으로 옮겼습니다.")
+        return True
+
+    # ---------- 압축 / 종료 ----------
+    async def compact_all(self):
+        for partition in self:
+            await partition.writer.compact()
+
+    async def close_all(self):
+        await asyncio.gather(*(partition.writer.close() for partition in self))
@@ -0,0 +1,103 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+import aiohttp
+
+# ============== BTC/KRW 시세 ==============
+# PriceOracle은 공급자(provider)에서 가져온 시세를 ttl 동안 캐시한다. 캐시가 만료된 상태에서
+# 여러 요청이 동시에 들어와도 진행 중인 조회 하나를 함께 기다리므로 중복 조회가 생기지 않는다.
+# 시세가 바뀔 때마다 tick이 증가하며, 전광판 렌더러는 tick을 기준으로 환산 금액을 다시 계산한다.
+
+
+class PriceProvider(ABC):
+    """시세 공급자 인터페이스: fetch()는 BTC 1개의 원화 가격을 반환"""
+    name = "base"
+
+    @abstractmethod
+    async def fetch(self) -> float:
+        ...
+
+    async def close(self):
+        pass
+
+
+class FixedPriceProvider(PriceProvider):
+    """고정 시세 (테스트/로컬 실행용)"""
+    name = "fixed"
+
+    def __init__(self, price: float):
+        self.price = price
+
+    async def fetch(self) -> float:
+        return self.price
+
+
+class UpbitPriceProvider(PriceProvider):
+    name = "upbit"
+    URL = "https://api.upbit.com/v1/ticker?markets=KRW-BTC"
+
+    def __init__(self, timeout: float = 5.0):
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session = None
+
+    async def fetch(self) -> float:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=self.timeout)
+        async with self._session.get(self.URL) as resp:
+            resp.raise_for_status()
+            data = await resp.json()
+        return float(data[0]["trade_price"])
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+
+
+class PriceOracle:
+    def __init__(self, provider: PriceProvider, ttl: float = 60.0, retry_after: float = 10.0):
+        self.provider = provider
+        self.ttl = ttl
+        self.retry_after = retry_after
+        self.price = None
+        self.tick = 0
+        self.fetches = 0
+        self.failures = 0
+        self._fetched_at = 0.0
+        self._failed_at = None
+        self._inflight = None
+
+    def fresh(self):
+        return self.price is not None and time.monotonic() - self._fetched_at < self.ttl
+
+    async def get(self):
+        """캐시된 시세 반환, 만료되었으면 갱신 (실패하면 이전 시세 또는 None)"""
+        if self.fresh():
+            return self.price
+        # 조회 실패 직후에는 잠시 재시도하지 않음
+        if self._failed_at is not None and time.monotonic() - self._failed_at < self.retry_after:
+            return self.price
+        if self._inflight is None:
+            self._inflight = asyncio.get_running_loop().create_task(self._refresh())
+        return await asyncio.shield(self._inflight)
+
+    async def _refresh(self):
+        try:
+            self.fetches += 1
+            price = await self.provider.fetch()
+        except Exception as e:
+            self.failures += 1
+            self._failed_at = time.monotonic()
+            print(f"시세 조회 실패 ({self.provider.name}): {e}")
+            return self.price
+        else:
+            if price != self.price:
+                self.price = price
+                self.tick += 1
+            self._fetched_at = time.monotonic()
+            self._failed_at = None
+            return self.price
+        finally:
+            self._inflight = None
+
+    async def close(self):
+        await self.provider.close()
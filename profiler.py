@@ -0,0 +1,76 @@
+import sys
+import threading
+import time
+from collections import Counter
+
+# ============== 샘플링 프로파일러 ==============
+# 별도 스레드가 interval마다 대상 스레드(이벤트 루프)의 현재 호출 스택을 읽어 개수를 센다.
+# 코드에 계측을 넣지 않으므로 켜 두어도 이벤트 루프가 느려지지 않는다.
+# 결과는 flamegraph.pl / speedscope에서 읽을 수 있는 collapsed 형식("a;b;c 개수")으로 내보낸다.
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{code.co_name}:{frame.f_lineno}"
+
+
+class SamplingProfiler:
+    def __init__(self, interval=0.005, max_depth=64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks = Counter()
+        self.samples = 0
+        self.started_at = None
+        self._target = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self, target_thread_id=None):
+        """target_thread_id(기본: 호출한 스레드)의 스택 샘플링 시작"""
+        if self.running:
+            return False
+        self.stacks.clear()
+        self.samples = 0
+        self.started_at = time.monotonic()
+        self._target = target_thread_id or threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, name="profiler", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        if not self.running:
+            return False
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        return True
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None and len(names) < self.max_depth:
+                names.append(_frame_name(frame))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(names))] += 1
+            self.samples += 1
+
+    # ---------- 결과 ----------
+    def collapsed(self):
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+    def top(self, limit=10):
+        """가장 많이 잡힌 함수 (self 기준, 줄 번호 제외) [(이름, 샘플 수)]"""
+        functions = Counter()
+        for stack, count in self.stacks.items():
+            leaf = stack.rsplit(";", 1)[-1]
+            functions[leaf.rsplit(":", 1)[0]] += count
+        return functions.most_common(limit)
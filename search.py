@@ -0,0 +1,236 @@
+import re
+from bisect import bisect_left, bisect_right, insort
+
+# ============== 전광판 검색 ==============
+# /전광판 필터를 전체 거래를 훑지 않고 다음 보조 인덱스로 처리한다.
+#   - (판매/구매, 거래 방식, 단위) 버킷마다 (premium, id) 정렬 리스트와 (amount, id) 정렬 리스트
+#   - 정제된 메모의 단어 -> 거래 id 집합 (역색인), 정렬된 단어 목록 (앞부분 일치 검색/자동완성용)
+# 버킷마다 범위 후보 수를 bisect로 바로 셀 수 있으므로 (검색어 후보 포함) 가장 작은 후보 집합 하나만 훑고
+# 나머지 조건은 거래 값으로 직접 확인한다. 결과는 전광판과 같은 (premium, id) 순서.
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return {token.lower() for token in _TOKEN_PATTERN.findall(text or "")}
+
+
+class TradeQuery:
+    def __init__(self, side, method=None, unit=None, amount_min=None, amount_max=None,
+                 premium_min=None, premium_max=None, keyword=None):
+        self.side = side
+        self.method = method
+        self.unit = unit
+        self.amount_min = amount_min
+        self.amount_max = amount_max
+        self.premium_min = premium_min
+        self.premium_max = premium_max
+        self.keyword = keyword or None
+
+    def with_side(self, side):
+        return TradeQuery(side, self.method, self.unit, self.amount_min, self.amount_max,
+                          self.premium_min, self.premium_max, self.keyword)
+
+    def describe(self):
+        parts = []
+        if self.method:
+            parts.append(self.method)
+        if self.unit:
+            parts.append(self.unit)
+        if self.amount_min is not None or self.amount_max is not None:
+            low = f"{self.amount_min:,}" if self.amount_min is not None else ""
+            high = f"{self.amount_max:,}" if self.amount_max is not None else ""
+            parts.append(f"수량 {low}~{high}")
+        if self.premium_min is not None or self.premium_max is not None:
+            low = f"{self.premium_min:+g}%" if self.premium_min is not None else ""
+            high = f"{self.premium_max:+g}%" if self.premium_max is not None else ""
+            parts.append(f"프리미엄 {low}~{high}")
+        if self.keyword:
+            parts.append(f"\"{self.keyword}\"")
+        return " | ".join(parts) or "전체"
+
+
+class TradeIndex:
+    def __init__(self, store):
+        self.store = store
+        self._premium = {}  # (side, method, unit) -> ([(premium, id)], [trade])
+        self._amount = {}  # (side, method, unit) -> [(amount, id)]
+        self._terms = {}  # 단어 -> {id}
+        self._vocab = []  # 정렬된 단어 목록
+        self._entries = {}  # id -> (bucket, premium 키, amount 키, 단어 집합)
+        self._build(store)
+        store.listeners.append(self._on_change)
+
+    def _build(self, trades):
+        # 처음 불러올 때는 한 번에 정렬
+        premium, amount = {}, {}
+        for trade in trades:
+            bucket, pkey, akey, tokens = self._entry(trade)
+            premium.setdefault(bucket, []).append((pkey, trade))
+            amount.setdefault(bucket, []).append(akey)
+            for token in tokens:
+                self._terms.setdefault(token, set()).add(trade.id)
+            self._entries[trade.id] = (bucket, pkey, akey, tokens)
+        for bucket, items in premium.items():
+            items.sort(key=lambda item: item[0])
+            self._premium[bucket] = ([key for key, _ in items], [trade for _, trade in items])
+        for bucket, keys in amount.items():
+            self._amount[bucket] = sorted(keys)
+        self._vocab = sorted(self._terms)
+
+    def _on_change(self, op, trade):
+        if op == "expiry":
+            return
+        if op == "clear":
+            self._premium.clear()
+            self._amount.clear()
+            self._terms.clear()
+            self._vocab.clear()
+            self._entries.clear()
+            return
+        if trade.id in self._entries:
+            self._remove(trade.id)
+        if op in ("add", "update"):
+            self._insert(trade)
+
+    @staticmethod
+    def _entry(trade):
+        bucket = (trade.trade_type, trade.method, trade.unit)
+        return bucket, (trade.premium, trade.id), (trade.amount, trade.id), tokenize(trade.note)
+
+    def _insert(self, trade):
+        bucket, pkey, akey, tokens = entry = self._entry(trade)
+        keys, trades = self._premium.setdefault(bucket, ([], []))
+        pos = bisect_left(keys, pkey)
+        keys.insert(pos, pkey)
+        trades.insert(pos, trade)
+        insort(self._amount.setdefault(bucket, []), akey)
+        for token in tokens:
+            ids = self._terms.get(token)
+            if ids is None:
+                ids = self._terms[token] = set()
+                insort(self._vocab, token)
+            ids.add(trade.id)
+        self._entries[trade.id] = entry
+
+    def _remove(self, trade_id):
+        bucket, pkey, akey, tokens = self._entries.pop(trade_id)
+        keys, trades = self._premium[bucket]
+        pos = bisect_left(keys, pkey)
+        del keys[pos]
+        del trades[pos]
+        amounts = self._amount[bucket]
+        del amounts[bisect_left(amounts, akey)]
+        for token in tokens:
+            ids = self._terms[token]
+            ids.discard(trade_id)
+            if not ids:
+                del self._terms[token]
+                del self._vocab[bisect_left(self._vocab, token)]
+
+    # ---------- 조회 ----------
+    def buckets(self, side, method=None, unit=None):
+        return [
+            bucket for bucket in self._premium
+            if bucket[0] == side and (method is None or bucket[1] == method) and (unit is None or bucket[2] == unit)
+        ]
+
+    def terms(self, prefix, limit=25):
+        """prefix로 시작하는 단어 목록 (정렬 순)"""
+        prefix = prefix.lower()
+        start = bisect_left(self._vocab, prefix)
+        result = []
+        for token in self._vocab[start:]:
+            if not token.startswith(prefix) or len(result) >= limit:
+                break
+            result.append(token)
+        return result
+
+    def term_count(self, token):
+        return len(self._terms.get(token, ()))
+
+    def _keyword_ids(self, keyword):
+        """검색어의 모든 단어가 (앞부분 일치로) 메모에 들어 있는 거래 id 집합"""
+        result = None
+        for query_token in tokenize(keyword):
+            ids = set()
+            for token in self.terms(query_token, limit=len(self._vocab)):
+                ids |= self._terms[token]
+            result = ids if result is None else result & ids
+            if not result:
+                return set()
+        return result if result is not None else set()
+
+    @staticmethod
+    def _slice(keys, low, high):
+        start = 0 if low is None else bisect_left(keys, (low,))
+        end = len(keys) if high is None else bisect_right(keys, (high, float("inf")))
+        return start, end
+
+    def search(self, query):
+        """query 조건에 맞는 거래 목록 (프리미엄 오름차순)"""
+        keyword_ids = self._keyword_ids(query.keyword) if query.keyword else None
+        if keyword_ids is not None and not keyword_ids:
+            return []
+
+        # 버킷마다 프리미엄/수량 범위 중 후보가 적은 쪽을 고름
+        plans = []
+        for bucket in self.buckets(query.side, query.method, query.unit):
+            p_start, p_end = self._slice(self._premium[bucket][0], query.premium_min, query.premium_max)
+            a_start, a_end = self._slice(self._amount[bucket], query.amount_min, query.amount_max)
+            if p_end - p_start <= a_end - a_start:
+                plans.append((bucket, "premium", p_start, p_end))
+            else:
+                plans.append((bucket, "amount", a_start, a_end))
+
+        # 검색어 후보가 범위 후보 전체보다 적으면 버킷별로 한 번만 나눠서 후보로 씀
+        keyword_by_bucket = None
+        if keyword_ids is not None and len(keyword_ids) < sum(end - start for _, _, start, end in plans):
+            keyword_by_bucket = {}
+            for trade_id in keyword_ids:
+                keyword_by_bucket.setdefault(self._entries[trade_id][0], []).append(trade_id)
+
+        results = []
+        for bucket, kind, start, end in plans:
+            if keyword_by_bucket is not None and len(keyword_by_bucket.get(bucket, ())) < end - start:
+                candidates = [self.store.get(trade_id) for trade_id in keyword_by_bucket.get(bucket, ())]
+            elif kind == "premium":
+                candidates = self._premium[bucket][1][start:end]
+            else:
+                candidates = [self.store.get(trade_id) for _, trade_id in self._amount[bucket][start:end]]
+
+            for trade in candidates:
+                if query.premium_min is not None and trade.premium < query.premium_min:
+                    continue
+                if query.premium_max is not None and trade.premium > query.premium_max:
+                    continue
+                if query.amount_min is not None and trade.amount < query.amount_min:
+                    continue
+                if query.amount_max is not None and trade.amount > query.amount_max:
+                    continue
+                if keyword_ids is not None and trade.id not in keyword_ids:
+                    continue
+                results.append(trade)
+
+        if len(results) > 1:
+            results.sort(key=lambda t: (t.premium, t.id))
+        return results
+
+    # ---------- 자동완성 ----------
+    def amount_points(self, side, method=None, unit=None, count=5):
+        """버킷별 수량 정렬 리스트에서 고른 대표 값 (최소/사분위/최대)"""
+        return self._points([self._amount[b] for b in self.buckets(side, method, unit)], count)
+
+    def premium_points(self, side, method=None, unit=None, count=5):
+        return self._points([self._premium[b][0] for b in self.buckets(side, method, unit)], count)
+
+    @staticmethod
+    def _points(sorted_lists, count):
+        values = set()
+        for keys in sorted_lists:
+            if not keys:
+                continue
+            last = len(keys) - 1
+            for n in range(count):
+                values.add(keys[last * n // max(count - 1, 1)][0])
+        return sorted(values)
@@ -0,0 +1,461 @@
+import asyncio
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from store import TradeStore
+from trade import FORMAT, Trade, decode_trade
+
+# ============== 저널 저장소 ==============
+# data/trades.json 스냅샷 + data/trades.log 추가 전용 로그.
+# 변경 1건당 로그에 한 줄만 추가하고, 스냅샷은 주기적으로/로그 크기 기준으로 압축(compaction)한다.
+# 스냅샷과 로그 레코드는 seq 번호를 가지며, 로드 시 스냅샷 seq 이후의 레코드만 재생한다.
+# 거래는 trade.FORMAT의 row 배열로 기록하고, 스냅샷에 format 번호를 남긴다.
+# 구버전 스냅샷(거래 목록만 있는 파일, dict 거래)과 로그도 그대로 읽는다.
+
+LOG_COMPACT_BYTES = 1_000_000
+BACKUP_KEEP = 3
+
+
+def journal_log_file(data_file):
+    """스냅샷 파일에 딸린 변경 로그 경로 (trades.json -> trades.log)"""
+    return os.path.splitext(data_file)[0] + ".log"
+
+
+def _dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def _parse_snapshot(data):
+    """스냅샷 JSON -> (거래 저장소, seq)"""
+    if isinstance(data, list):  # 구버전: 거래 목록만 저장된 파일
+        return TradeStore(map(decode_trade, data)), 0
+    store = TradeStore(map(decode_trade, data["trades"]), next_id=data.get("next_id", 1))
+    return store, data.get("seq", 0)
+
+
+class TradeJournal:
+    def __init__(self, data_file, compact_bytes=LOG_COMPACT_BYTES):
+        self.data_file = data_file
+        self.log_file = journal_log_file(data_file)
+        self.compact_bytes = compact_bytes
+        self.store = TradeStore()
+        self.seq = 0
+        self.snapshot_seq = 0
+        self._log = None
+
+    # ---------- 로드 ----------
+    def load(self):
+        """스냅샷을 읽고 이후의 로그를 재생해서 거래 저장소를 복원"""
+        store, seq = TradeStore(), 0
+        if os.path.exists(self.data_file):
+            with open(self.data_file, 'r', encoding='utf-8') as f:
+                store, seq = _parse_snapshot(json.load(f))
+        self.snapshot_seq = seq
+
+        if os.path.exists(self.log_file):
+            with open(self.log_file, 'rb') as f:
+                data = f.read()
+            *lines, tail = data.split(b"\n")
+            for lineno, line in enumerate(lines, 1):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # 구버전에서 잘린 줄 뒤에 이어 쓴 레코드 등: 그 줄만 건너뛰고 나머지는 재생
+                    print(f"⚠️ {self.log_file}:{lineno} 손상된 로그 레코드를 건너뜁니다.")
+                    continue
+                if record["seq"] <= seq:
+                    continue
+                apply_record(store, record)
+                seq = record["seq"]
+            if tail:
+                # 기록 도중 종료되어 줄바꿈 없이 잘린 마지막 줄: 그대로 두면 다음 기록이 그 뒤에 붙으므로 잘라냄
+                print(f"⚠️ {self.log_file}: 잘린 마지막 레코드를 잘라냅니다.")
+                with open(self.log_file, 'r+b') as f:
+                    f.truncate(len(data) - len(tail))
+
+        self.store = store
+        self.seq = seq
+        return store
+
+    def next_seq(self):
+        self.seq += 1
+        return self.seq
+
+    # ---------- 기록 (executor 스레드에서 호출) ----------
+    def write(self, records, fsync_each=False):
+        """레코드를 로그에 추가하고 기록한 바이트 수를 반환"""
+        if self._log is None:
+            os.makedirs(os.path.dirname(self.log_file), exist_ok=True)
+            self._log = open(self.log_file, 'a', encoding='utf-8')
+        size = 0
+        for record in records:
+            line = _dumps(record) + "\n"
+            size += len(line.encode("utf-8"))
+            self._log.write(line)
+            if fsync_each:
+                self._log.flush()
+                os.fsync(self._log.fileno())
+        if not fsync_each:
+            self._log.flush()
+            os.fsync(self._log.fileno())
+        return size
+
+    def needs_compaction(self):
+        return self._log is not None and self._log.tell() >= self.compact_bytes
+
+    # ---------- 압축 ----------
+    def snapshot_stale(self):
+        return self.seq != self.snapshot_seq or not os.path.exists(self.data_file)
+
+    def compact(self, trades, seq, next_id):
+        """seq 시점의 거래 row 목록을 스냅샷으로 저장하고 로그를 비움 (스냅샷 바이트 수 반환)"""
+        if trades is None:
+            return 0
+        size = write_snapshot(self.data_file, {"format": FORMAT, "seq": seq, "next_id": next_id, "trades": trades})
+        self.snapshot_seq = seq
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        # 스냅샷 이후(seq 초과) 레코드는 아직 큐에 있으므로 잘라내도 안전
+        open(self.log_file, 'w').close()
+        return size
+
+    def close(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+
+# ============== SQLite 저장소 ==============
+# WAL 모드 SQLite. 거래 전체는 data 열에 JSON 객체로 저장한다 (수정에 json_patch를 쓰므로 row 배열이 아닌 객체).
+# 시작할 때 모든 거래를 메모리의 TradeStore로 읽고 조회는 전부 TradeStore가 처리하므로,
+# JSON 저장소보다 시작 시간이나 메모리 사용량이 줄지 않는다 (차이는 압축 시 스냅샷 전체를 다시 쓰지 않는다는 점).
+# 그래서 보조 인덱스는 두지 않는다 (이전 버전이 만든 인덱스는 지움). user_id/trade_type/premium 열은 기존 파일과의 호환을 위해 유지.
+# TradeJournal과 같은 인터페이스를 제공하므로 PersistenceWriter가 그대로 사용한다. 압축 단계에서는 WAL 체크포인트만 수행한다.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    trade_type TEXT NOT NULL,
+    premium REAL NOT NULL,
+    data TEXT NOT NULL
+);
+DROP INDEX IF EXISTS idx_trades_user;
+DROP INDEX IF EXISTS idx_trades_side;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+SQL_INSERT = "INSERT OR REPLACE INTO trades (id, user_id, trade_type, premium, data) VALUES (?, ?, ?, ?, ?)"
+SQL_UPDATE = (
+    "UPDATE trades SET data = json_patch(data, :fields), "
+    "premium = json_extract(json_patch(data, :fields), '$.premium') WHERE id = :id"
+)
+SQL_DELETE = "DELETE FROM trades WHERE id = ?"
+SQL_SET_META = "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)"
+
+
+class SqliteBackend:
+    def __init__(self, db_file):
+        self.db_file = db_file
+        self.store = TradeStore()
+        self.seq = 0
+        os.makedirs(os.path.dirname(db_file), exist_ok=True)
+        # 로드 이후에는 PersistenceWriter의 단일 스레드 executor에서만 접근
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def load(self):
+        next_id = self._meta("next_id", 1)
+        self.seq = self._meta("seq", 0)
+        rows = self.conn.execute("SELECT data FROM trades ORDER BY id")
+        self.store = TradeStore((Trade.from_dict(json.loads(data)) for data, in rows), next_id=next_id)
+        return self.store
+
+    def _meta(self, key, default):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def next_seq(self):
+        self.seq += 1
+        return self.seq
+
+    # ---------- 기록 (executor 스레드에서 호출) ----------
+    def write(self, records, fsync_each=False):
+        # strict 모드: 레코드마다 커밋(FULL 동기화) / group 모드: 배치 전체를 한 트랜잭션으로
+        # 반환값은 기록한 JSON 데이터의 바이트 수 (SQLite 페이지 단위 크기는 아님)
+        self.conn.execute(f"PRAGMA synchronous={'FULL' if fsync_each else 'NORMAL'}")
+        size = 0
+        if fsync_each:
+            for record in records:
+                with self.conn:
+                    size += self._apply(record)
+        else:
+            with self.conn:
+                for record in records:
+                    size += self._apply(record)
+        return size
+
+    def _apply(self, record):
+        op = record["op"]
+        size = 0
+        if op == "add":
+            t = decode_trade(record["trade"])
+            data = _dumps(t.to_dict())
+            size = len(data.encode("utf-8"))
+            self.conn.execute(SQL_INSERT, (t.id, t.user_id, t.trade_type, t.premium, data))
+            self.conn.execute(SQL_SET_META, ("next_id", t.id + 1))
+        elif op == "update":
+            fields = _dumps(record["fields"])
+            size = len(fields.encode("utf-8"))
+            self.conn.execute(SQL_UPDATE, {"id": record["id"], "fields": fields})
+        elif op == "delete":
+            self.conn.execute(SQL_DELETE, (record["id"],))
+        elif op == "clear":
+            self.conn.execute("DELETE FROM trades")
+        self.conn.execute(SQL_SET_META, ("seq", record["seq"]))
+        return size
+
+    def needs_compaction(self):
+        return False
+
+    def snapshot_stale(self):
+        return False
+
+    def compact(self, trades, seq, next_id):
+        self.conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+        return 0
+
+    def close(self):
+        self.conn.close()
+
+    # ---------- JSON 저장소에서 이전 ----------
+    def import_store(self, store):
+        with self.conn:
+            self.conn.execute("DELETE FROM trades")
+            self.conn.executemany(SQL_INSERT, (
+                (t.id, t.user_id, t.trade_type, t.premium, _dumps(t.to_dict())) for t in store
+            ))
+            self.conn.execute(SQL_SET_META, ("next_id", store.next_id))
+
+
+def load_json_with_backups(data_file):
+    """JSON 저장소를 읽되, 스냅샷이 손상됐으면 최신 백업부터 차례로 시도"""
+    try:
+        return TradeJournal(data_file).load()
+    except ValueError:
+        backup_dir = os.path.join(os.path.dirname(data_file), "backups")
+        backups = sorted(
+            [os.path.join(backup_dir, f) for f in os.listdir(backup_dir) if f.endswith('.json')],
+            key=os.path.getmtime, reverse=True
+        ) if os.path.isdir(backup_dir) else []
+        for path in backups:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except ValueError:
+                continue
+            return _parse_snapshot(data)[0]
+        raise
+
+
+def migrate_json_to_sqlite(data_file, db_file):
+    """JSON 스냅샷+로그(또는 백업)의 거래를 SQLite로 옮기고 옮긴 개수를 반환"""
+    store = load_json_with_backups(data_file)
+    backend = SqliteBackend(db_file)
+    backend.import_store(store)
+    backend.close()
+    return len(store)
+
+
+def open_backend(kind, data_file, db_file, compact_bytes=LOG_COMPACT_BYTES):
+    """config의 STORAGE_BACKEND에 따라 저장소를 생성"""
+    if kind == "json":
+        return TradeJournal(data_file, compact_bytes=compact_bytes)
+    if kind == "sqlite":
+        # 처음 SQLite로 전환하면 기존 JSON 데이터(스냅샷 또는 로그만 있는 경우 포함)를 자동으로 이전
+        journal_files = (data_file, journal_log_file(data_file))
+        if not os.path.exists(db_file) and any(os.path.exists(path) for path in journal_files):
+            count = migrate_json_to_sqlite(data_file, db_file)
+            print(f"📦 {data_file} → {db_file}: 거래 {count}개 이전")
+        return SqliteBackend(db_file)
+    raise ValueError(f"알 수 없는 저장소: {kind}")
+
+
+# ============== 비동기 기록 작업 ==============
+# 핸들러는 레코드를 큐에 넣고 바로 반환한다. 기록 작업은 coalesce_window 동안 들어온
+# 레코드를 모아 단일 스레드 executor에서 한 번에 기록(group commit)한다.
+# strict 모드에서는 레코드마다 fsync하고 핸들러가 기록 완료를 기다린다.
+# 기록/압축이 끝날 때마다 listeners에 (op, 소요 시간(초), 바이트 수, 레코드 수)가 전달된다.
+# op는 "write" 또는 "compact".
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+class PersistenceWriter:
+    def __init__(self, backend, durability="group", coalesce_window=0.2):
+        if durability not in ("group", "strict"):
+            raise ValueError(f"알 수 없는 durability 모드: {durability}")
+        self.backend = backend
+        self.durability = durability
+        self.coalesce_window = coalesce_window
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="persistence")
+        self._queue = asyncio.Queue()
+        self._task = None
+        self.listeners = []
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    # ---------- 변경 기록 ----------
+    async def add(self, trade):
+        await self._submit({"op": "add", "trade": trade.to_row()})
+
+    async def update(self, trade_id, fields):
+        await self._submit({"op": "update", "id": trade_id, "fields": dict(fields)})
+
+    async def delete(self, trade_id):
+        await self._submit({"op": "delete", "id": trade_id})
+
+    async def delete_many(self, trade_ids):
+        """여러 삭제를 중간에 다른 변경이 끼어들지 않도록 한 번에 큐에 넣음"""
+        await self._submit(*({"op": "delete", "id": i} for i in trade_ids))
+
+    async def clear(self):
+        await self._submit({"op": "clear"})
+
+    async def _submit(self, *records):
+        # seq는 이벤트 루프에서 변경 순서대로 부여
+        future = asyncio.get_running_loop().create_future() if self.durability == "strict" else None
+        for record in records:
+            record["seq"] = self.backend.next_seq()
+            self._queue.put_nowait((record, future))
+        if future is not None:
+            await future
+
+    # ---------- 압축 / 종료 ----------
+    async def compact(self):
+        """현재 거래 목록을 복사해서 executor에서 압축(스냅샷 저장 / WAL 체크포인트)"""
+        store = self.backend.store
+        # 스냅샷이 필요 없는 경우(변경 없음, SQLite)에는 목록을 복사하지 않음
+        trades = [t.to_row() for t in store] if self.backend.snapshot_stale() else None
+        size, seconds = await asyncio.get_running_loop().run_in_executor(
+            self._executor, _timed, self.backend.compact, trades, self.backend.seq, store.next_id
+        )
+        self._notify("compact", seconds, size, 0 if trades is None else len(trades))
+
+    def _notify(self, op, seconds, size, count):
+        for listener in self.listeners:
+            listener(op, seconds, size, count)
+
+    async def flush(self):
+        """큐에 남은 레코드를 모두 기록하고 스냅샷으로 압축"""
+        await self._queue.join()
+        await self.compact()
+
+    async def close(self):
+        await self.flush()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await asyncio.get_running_loop().run_in_executor(self._executor, self.backend.close)
+        self._executor.shutdown(wait=True)
+
+    # ---------- 기록 루프 ----------
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        strict = self.durability == "strict"
+        while True:
+            batch = [await self._queue.get()]
+            if not strict and self.coalesce_window > 0:
+                await asyncio.sleep(self.coalesce_window)
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            records = [record for record, _ in batch]
+            try:
+                size, seconds = await loop.run_in_executor(self._executor, _timed, self.backend.write, records, strict)
+                self._notify("write", seconds, size, len(records))
+                if self.backend.needs_compaction():
+                    await self.compact()
+            except Exception as e:
+                import traceback
+                traceback.print_exception(type(e), e, e.__traceback__)
+                for _, future in batch:
+                    if future is not None and not future.done():
+                        future.set_exception(e)
+            else:
+                for _, future in batch:
+                    if future is not None and not future.done():
+                        future.set_result(None)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+
+def apply_record(store, record):
+    op = record["op"]
+    if op == "clear":
+        store.clear()
+        return
+    if op == "add":
+        store.add(decode_trade(record["trade"]))
+        return
+    # 구버전 로그는 id 대신 목록 위치(index)를 기록함
+    trade_id = record["id"] if "id" in record else list(store)[record["index"]].id
+    if op == "update":
+        store.update(trade_id, record["fields"])
+    elif op == "delete":
+        store.delete(trade_id)
+
+
+def write_snapshot(data_file, data):
+    """Atomic write: 임시 파일에 쓴 후 rename으로 교체 (기록한 바이트 수 반환)"""
+    dir_name = os.path.dirname(data_file)
+    os.makedirs(dir_name, exist_ok=True)
+
+    # 같은 디렉토리에 임시 파일 생성
+    fd, tmp_path = tempfile.mkstemp(dir=dir_name, suffix=".tmp", prefix="trades_")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(_dumps(data))
+            f.flush()
+            os.fsync(f.fileno())
+        size = os.path.getsize(tmp_path)
+
+        # 기존 파일 백업 (최근 3개 유지)
+        if os.path.exists(data_file):
+            backup_dir = os.path.join(dir_name, "backups")
+            os.makedirs(backup_dir, exist_ok=True)
+            backup_name = f"trades_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            backup_path = os.path.join(backup_dir, backup_name)
+            shutil.copy2(data_file, backup_path)
+
+            # 오래된 백업 정리 (최근 3개만 유지)
+            backups = sorted(
+                [os.path.join(backup_dir, f) for f in os.listdir(backup_dir) if f.endswith('.json')],
+                key=os.path.getmtime
+            )
+            while len(backups) > BACKUP_KEEP:
+                os.unlink(backups.pop(0))
+
+        # Atomic rename
+        os.replace(tmp_path, data_file)
+        return size
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
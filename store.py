@@ -0,0 +1,145 @@
+from bisect import bisect_left
+from collections import defaultdict
+from trade import TRADE_TYPES
+
+# ============== 거래 저장소 ==============
+# 거래(Trade)를 고유 id로 보관하고, 다음 인덱스를 변경 시점에 함께 갱신한다.
+#   - 유저별 인덱스: user_id -> {id: trade} (등록 순서)
+#   - 판매/구매별 정렬 인덱스: (premium, id) 키 정렬 리스트 + 같은 순서의 거래 리스트
+# id는 등록 순서대로 증가하므로 같은 프리미엄끼리는 먼저 등록한 거래가 앞에 온다.
+# 변경마다 version / side_version이 증가하고 listeners에 (op, trade)가 전달된다.
+# op는 "add", "update", "delete", "clear"(trade=None), "expiry" 중 하나.
+# "expiry"는 만료 시각/알림 여부만 바뀐 경우로, 전광판 내용이 그대로이므로 version을 올리지 않는다.
+
+class TradeStore:
+    def __init__(self, trades=(), next_id=1):
+        self._by_id = {}
+        self._by_user = defaultdict(dict)
+        self._side_keys = {side: [] for side in TRADE_TYPES}
+        self._side_trades = {side: [] for side in TRADE_TYPES}
+        self.next_id = next_id
+        self.version = 0
+        self.side_version = {side: 0 for side in TRADE_TYPES}
+        self.listeners = []
+        # 처음 불러올 때는 하나씩 삽입하지 않고 판매/구매별로 한 번에 정렬
+        items = {side: [] for side in TRADE_TYPES}
+        for trade in trades:
+            self._track(trade)
+            items[trade.trade_type].append((self._key(trade), trade))
+        for side, pairs in items.items():
+            pairs.sort(key=lambda pair: pair[0])
+            self._side_keys[side] = [key for key, _ in pairs]
+            self._side_trades[side] = [trade for _, trade in pairs]
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __iter__(self):
+        return iter(self._by_id.values())
+
+    def __bool__(self):
+        return bool(self._by_id)
+
+    # ---------- 조회 ----------
+    def get(self, trade_id):
+        return self._by_id.get(trade_id)
+
+    def user_trades(self, user_id):
+        """유저의 거래 목록 (등록 순서)"""
+        trades = self._by_user.get(user_id)
+        return list(trades.values()) if trades else []
+
+    def side(self, trade_type):
+        """프리미엄 오름차순으로 정렬된 판매/구매 목록. 읽기 전용으로 사용할 것"""
+        return self._side_trades[trade_type]
+
+    # ---------- 변경 ----------
+    def add(self, trade):
+        """거래를 추가하고 id를 부여 (이미 id가 있으면 그대로 사용)"""
+        self._track(trade)
+        self._index(trade)
+        self._changed("add", trade)
+        return trade
+
+    def _track(self, trade):
+        if trade.id is None:
+            trade.id = self.next_id
+        self.next_id = max(self.next_id, trade.id + 1)
+        self._by_id[trade.id] = trade
+        self._by_user[trade.user_id][trade.id] = trade
+
+    def update(self, trade_id, fields):
+        trade = self._by_id.get(trade_id)
+        if trade is None:
+            return None
+        self._unindex(trade)
+        trade.update(fields)
+        self._index(trade)
+        self._changed("update", trade)
+        return trade
+
+    def update_expiry(self, trade_id, fields):
+        """만료 관련 필드(expires_at, expiry_noticed)만 변경 (정렬 인덱스/전광판 캐시는 그대로)"""
+        trade = self._by_id.get(trade_id)
+        if trade is None:
+            return None
+        trade.update(fields)
+        for listener in self.listeners:
+            listener("expiry", trade)
+        return trade
+
+    def delete(self, trade_id):
+        trade = self._by_id.pop(trade_id, None)
+        if trade is None:
+            return None
+        user_trades = self._by_user[trade.user_id]
+        del user_trades[trade_id]
+        if not user_trades:
+            del self._by_user[trade.user_id]
+        self._unindex(trade)
+        self._changed("delete", trade)
+        return trade
+
+    def delete_user(self, user_id):
+        """유저의 거래를 모두 삭제하고 삭제된 목록을 반환"""
+        trades = list(self._by_user.pop(user_id, {}).values())
+        for trade in trades:
+            del self._by_id[trade.id]
+            self._unindex(trade)
+            self._changed("delete", trade)
+        return trades
+
+    def clear(self):
+        self._by_id.clear()
+        self._by_user.clear()
+        for side in TRADE_TYPES:
+            self._side_keys[side].clear()
+            self._side_trades[side].clear()
+            self.side_version[side] += 1
+        self.version += 1
+        for listener in self.listeners:
+            listener("clear", None)
+
+    def _changed(self, op, trade):
+        self.version += 1
+        self.side_version[trade.trade_type] += 1
+        for listener in self.listeners:
+            listener(op, trade)
+
+    # ---------- 정렬 인덱스 ----------
+    @staticmethod
+    def _key(trade):
+        return (trade.premium, trade.id)
+
+    def _index(self, trade):
+        keys = self._side_keys[trade.trade_type]
+        key = self._key(trade)
+        pos = bisect_left(keys, key)
+        keys.insert(pos, key)
+        self._side_trades[trade.trade_type].insert(pos, trade)
+
+    def _unindex(self, trade):
+        keys = self._side_keys[trade.trade_type]
+        pos = bisect_left(keys, self._key(trade))
+        del keys[pos]
+        del self._side_trades[trade.trade_type][pos]
@@ -0,0 +1,46 @@
+"""전광판 렌더링 테스트: 페이지 경계와 Discord Embed 제한"""
+from board import (
+    FIELD_CHAR_LIMIT, LINE_MAX_CHARS, PAGE_CHAR_LIMIT, PAGE_MAX_LINES,
+    BoardRenderer, format_board_line, price_suffixes,
+)
+from store import TradeStore
+from trade import Trade
+from validation import NOTE_MAX_LENGTH
+
+
+class FixedOracle:
+    price = 5_000_000_000
+    tick = 1
+
+
+def longest_trade(trade_id, unit):
+    return Trade(1, 9 * 10**19, "user", "판매", "라이트닝", unit, 100_000_000, -49.99,
+                 note="가" * NOTE_MAX_LENGTH, id=trade_id)
+
+
+def test_line_max_chars_bounds_longest_line():
+    for unit in ("sats", "원"):
+        trade = longest_trade(9_999_999_999, unit)
+        head, tail = format_board_line(trade)
+        assert len(head + price_suffixes([trade], FixedOracle.price)[0] + tail) <= LINE_MAX_CHARS
+
+
+def test_pages_fit_discord_limits():
+    store = TradeStore(longest_trade(i, "sats") for i in range(1, PAGE_MAX_LINES * 3 + 2))
+    board = BoardRenderer(store, FixedOracle())
+    assert board.page_count("판매") == 4
+    for page in range(board.page_count("판매")):
+        embed, shown = board.page_embed("판매", page)
+        assert shown == page
+        assert all(len(field.value) <= FIELD_CHAR_LIMIT for field in embed.fields)
+        assert sum(len(field.value) for field in embed.fields) <= PAGE_CHAR_LIMIT
+        assert len(embed) <= 6000
+
+
+def test_page_embed_formats_only_shown_page():
+    store = TradeStore(longest_trade(i, "sats") for i in range(1, 1001))
+    board = BoardRenderer(store)
+    board.page_embed("판매", 5)
+    assert board.stats()["cached_lines"] == PAGE_MAX_LINES
+    _, page = board.page_embed("판매", 10_000)
+    assert page == board.page_count("판매") - 1
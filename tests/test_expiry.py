@@ -0,0 +1,57 @@
+"""거래 만료 테스트: 알림 중복과 알림 시각"""
+import asyncio
+import time
+
+from expiry import ExpirySweeper
+from store import TradeStore
+from trade import Trade
+
+TTL = 3600
+NOTICE_BEFORE = 600
+
+
+class FakePartition:
+    guild_id = 1
+
+    def __init__(self):
+        self.store = TradeStore()
+
+
+def make_sweeper(notices, ttl=TTL):
+    async def on_notice(partition, trade):
+        notices.append(trade.id)
+        partition.store.update_expiry(trade.id, {"expiry_noticed": True})
+
+    async def on_expire(partition, trade):
+        partition.store.delete(trade.id)
+
+    return ExpirySweeper(lambda guild_id, trade_type: ttl, on_notice, on_expire, notice_before=NOTICE_BEFORE)
+
+
+def test_edits_before_notice_window_send_one_notice():
+    notices = []
+    sweeper = make_sweeper(notices)
+    partition = FakePartition()
+    sweeper.track_partition(partition)
+    # 알림 시각이 이미 지난 거래: 알림 시각 전에 여러 번 수정하면 수정마다 알림 항목이 힙에 추가됨
+    expires_at = int(time.time()) + NOTICE_BEFORE - 5
+    trade = partition.store.add(Trade(1, 10, "user", "판매", "라이트닝", "sats", 1000, 1.0, expires_at=expires_at))
+    for premium in (1.5, 2.0, 2.5):
+        partition.store.update(trade.id, {"premium": premium})
+
+    asyncio.run(sweeper._process_due())
+    asyncio.run(sweeper._process_due())
+    assert notices == [trade.id]
+    assert partition.store.get(trade.id) is not None
+
+
+def test_ttl_within_notice_window_sends_no_notice():
+    notices = []
+    sweeper = make_sweeper(notices, ttl=NOTICE_BEFORE)
+    partition = FakePartition()
+    sweeper.track_partition(partition)
+    expires_at = sweeper.expiry_for(1, "판매")
+    partition.store.add(Trade(1, 10, "user", "판매", "라이트닝", "sats", 1000, 1.0, expires_at=expires_at))
+
+    asyncio.run(sweeper._process_due())
+    assert notices == []
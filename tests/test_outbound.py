@@ -0,0 +1,51 @@
+"""발신 스케줄러 테스트: 자동 defer와 respond()의 첫 응답"""
+import asyncio
+
+from outbound import OutboundScheduler, respond
+
+
+class SlowResponse:
+    """send_message 요청이 defer_after보다 오래 걸리는 가짜 InteractionResponse"""
+    def __init__(self, latency):
+        self.latency = latency
+        self.done = False
+        self.calls = []
+
+    def is_done(self):
+        return self.done
+
+    async def send_message(self, **kwargs):
+        self.calls.append("send")
+        await asyncio.sleep(self.latency)
+        self.done = True
+
+    async def defer(self, **kwargs):
+        self.calls.append("defer")
+        self.done = True
+
+
+class FakeInteraction:
+    type = None
+
+    def __init__(self, latency):
+        self.response = SlowResponse(latency)
+        self.extras = {}
+
+
+def test_watchdog_does_not_defer_while_respond_in_flight():
+    async def main():
+        outbound = OutboundScheduler({}, defer_after=0.05)
+
+        @outbound.guard()
+        async def handler(interaction):
+            await asyncio.sleep(0.02)
+            await respond(interaction, "ok")
+
+        interaction = FakeInteraction(latency=0.1)
+        await handler(interaction)
+        await asyncio.sleep(0.05)
+        return interaction, outbound
+
+    interaction, outbound = asyncio.run(main())
+    assert interaction.response.calls == ["send"]
+    assert outbound.deferred == 0
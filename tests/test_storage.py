@@ -0,0 +1,28 @@
+"""저널 저장소 테스트: 기록 도중 종료되어 마지막 줄이 잘린 로그"""
+from storage import TradeJournal
+from trade import Trade
+
+
+def add_record(journal, trade_id):
+    trade = Trade(1, 10, "user", "판매", "라이트닝", "sats", 1000 + trade_id, 1.0, id=trade_id)
+    return {"op": "add", "seq": journal.next_seq(), "trade": trade.to_row()}
+
+
+def test_torn_last_line_keeps_later_appends(tmp_path):
+    data_file = str(tmp_path / "trades.json")
+    journal = TradeJournal(data_file)
+    journal.load()
+    journal.write([add_record(journal, 1), add_record(journal, 2)])
+    journal.close()
+    # 세 번째 레코드를 쓰던 중 종료: 줄바꿈 없이 잘린 마지막 줄
+    with open(journal.log_file, "a", encoding="utf-8") as f:
+        f.write('{"op":"add","seq":3,"trade":[1,10,"us')
+
+    journal = TradeJournal(data_file)
+    assert sorted(t.id for t in journal.load()) == [1, 2]
+    journal.write([add_record(journal, 3), add_record(journal, 4)])
+    journal.close()
+
+    journal = TradeJournal(data_file)
+    assert sorted(t.id for t in journal.load()) == [1, 2, 3, 4]
+    journal.close()
@@ -0,0 +1,162 @@
+"""validation 모듈 테스트
+
+- 동등성: 무작위 입력(fuzz 코퍼스)에 대해 기존 bot.py의 validate_trade_input / sanitize_note와
+  결과(수락/거절, 값, 오류 메시지)가 완전히 같아야 한다.
+- 벤치마크: pytest-benchmark가 있으면 기존 구현과 validate_many의 처리량을 잰다.
+
+    python -m pytest tests
+    python -m pytest tests --benchmark-only
+"""
+import importlib.util
+import math
+import random
+import re
+
+import pytest
+
+from validation import (
+    AMOUNT_LIMITS, NOTE_MAX_LENGTH, PREMIUM_MAX, PREMIUM_MIN,
+    check_trade_input, sanitize_note, validate_many, validate_trade_input,
+)
+
+
+# ============== 기존 구현 (bot.py에서 옮기기 전) ==============
+def baseline_sanitize_note(raw: str) -> str:
+    if not raw or not raw.strip():
+        return ""
+    text = raw.strip()
+    text = text.replace("@everyone", "@\u200beveryone")
+    text = text.replace("@here", "@\u200bhere")
+    text = re.sub(r'<(@[!&]?\d+|#\d+)>', r'`\1`', text)
+    text = text.replace("```", "\\`\\`\\`")
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    return text
+
+
+def baseline_validate_trade_input(amount_raw: str, premium_raw: str, note_raw: str, unit: str):
+    errors = []
+
+    amount_cleaned = amount_raw.strip().replace(",", "").replace(" ", "")
+    try:
+        amount_num = int(amount_cleaned)
+    except (ValueError, OverflowError):
+        errors.append("• **수량**: 숫자만 입력해주세요. (예: 100000 또는 100,000)")
+        amount_num = None
+
+    if amount_num is not None:
+        limits = AMOUNT_LIMITS.get(unit)
+        if limits is None:
+            errors.append(f"• **단위**: 알 수 없는 단위입니다: {unit}")
+        else:
+            if amount_num <= 0:
+                errors.append("• **수량**: 수량은 양수여야 합니다.")
+            elif amount_num < limits["min"]:
+                errors.append(f"• **수량**: 최소 수량은 {limits['display']}입니다.")
+            elif amount_num > limits["max"]:
+                errors.append(f"• **수량**: 최대 수량은 {limits['display']}입니다.")
+
+    premium_cleaned = premium_raw.strip().replace("%", "").replace(" ", "")
+    try:
+        premium_num = float(premium_cleaned)
+    except (ValueError, OverflowError):
+        errors.append("• **프리미엄**: 숫자만 입력해주세요. (예: 5 또는 -3.5)")
+        premium_num = None
+
+    if premium_num is not None:
+        if math.isinf(premium_num) or math.isnan(premium_num):
+            errors.append("• **프리미엄**: 유효한 숫자를 입력해주세요.")
+        elif premium_num < PREMIUM_MIN:
+            errors.append(f"• **프리미엄**: 프리미엄은 {PREMIUM_MIN}% 이상이어야 합니다.")
+        elif premium_num > PREMIUM_MAX:
+            errors.append(f"• **프리미엄**: 프리미엄은 {PREMIUM_MAX}% 이하여야 합니다.")
+
+    note_clean = baseline_sanitize_note(note_raw)
+    if len(note_clean) > NOTE_MAX_LENGTH:
+        errors.append(f"• **메모**: 메모는 {NOTE_MAX_LENGTH}자 이하로 입력해주세요. (현재: {len(note_clean)}자)")
+
+    if errors:
+        return None, "❌ 입력값을 확인해주세요:\n" + "\n".join(errors)
+
+    return (amount_num, round(premium_num, 2) if premium_num is not None else 0, note_clean), None
+
+
+# ============== fuzz 코퍼스 ==============
+AMOUNT_PIECES = ["0", "1", "5", "9", "000", ",", " ", "-", "+", ".", "_", "e", "١", "\t", "1000", "100,000,000", "99999999999"]
+PREMIUM_PIECES = ["0", "1", "3", ".", "5", "-", "+", "%", " ", "e", "9", "50", "100", "nan", "inf", "1e309", "_", "\n"]
+NOTE_PIECES = [
+    "빠른 거래", "네고 가능", " ", "\n", "\n\n\n", "@everyone", "@here", "@", "everyone", "<@123>", "<@!45>", "<@&67>",
+    "<#89>", "<@>", "<", ">", "`", "```", "``", "a" * 50, "가" * 40, "\u200b", "#", "!", "&",
+]
+UNITS = ["sats", "won", "원", "btc", ""]
+
+
+def _join(rng, pieces, max_len):
+    return "".join(rng.choice(pieces) for _ in range(rng.randrange(max_len + 1)))
+
+
+def fuzz_corpus(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        (_join(rng, AMOUNT_PIECES, 4), _join(rng, PREMIUM_PIECES, 4), _join(rng, NOTE_PIECES, 12), rng.choice(UNITS))
+        for _ in range(count)
+    ]
+
+
+EDGE_CASES = [
+    ("1000", "-50", "", "sats"),
+    ("999", "0", "", "sats"),
+    ("100,000,000", "100", "", "won"),
+    ("100000001", "100.001", "", "sats"),
+    ("1 000", "5 %", "<@123> @everyone", "sats"),
+    ("10000", "-50.005", "x" * NOTE_MAX_LENGTH, "sats"),
+    ("10000", "3.14159", "x" * (NOTE_MAX_LENGTH + 1), "sats"),
+    ("10000", "nan", "\n\n\n\n", "sats"),
+    ("-5", "inf", "```", "sats"),
+    ("abc", "abc", "   ", "원"),
+]
+CORPUS = EDGE_CASES + fuzz_corpus(20_000)
+
+
+# ============== 동등성 ==============
+def test_sanitize_note_matches_baseline():
+    for _, _, note, _ in CORPUS:
+        assert sanitize_note(note) == baseline_sanitize_note(note), repr(note)
+
+
+def test_validate_trade_input_matches_baseline():
+    for args in CORPUS:
+        assert validate_trade_input(*args) == baseline_validate_trade_input(*args), repr(args)
+
+
+def test_corpus_covers_accept_and_reject():
+    accepted = sum(baseline_validate_trade_input(*args)[1] is None for args in CORPUS)
+    assert 0 < accepted < len(CORPUS)
+
+
+def test_validate_many_matches_single():
+    results = validate_many(CORPUS)
+    assert len(results) == len(CORPUS)
+    for args, result in zip(CORPUS, results):
+        assert result == check_trade_input(*args)
+        value, error = validate_trade_input(*args)
+        assert result.ok == (error is None)
+        if result.ok:
+            assert (result.amount, result.premium, result.note) == value
+            assert result.errors == ()
+        else:
+            assert error == "❌ 입력값을 확인해주세요:\n" + "\n".join(result.errors)
+
+
+# ============== 벤치마크 ==============
+BENCH_CORPUS = CORPUS[:5_000]
+needs_benchmark = pytest.mark.skipif(importlib.util.find_spec("pytest_benchmark") is None, reason="pytest-benchmark 없음")
+
+
+@needs_benchmark
+def test_bench_baseline(benchmark):
+    benchmark(lambda: [baseline_validate_trade_input(*args) for args in BENCH_CORPUS])
+
+
+@needs_benchmark
+def test_bench_validate_many(benchmark):
+    benchmark(validate_many, BENCH_CORPUS)
@@ -0,0 +1,140 @@
+import sys
+import time
+from datetime import datetime
+
+# ============== 거래 레코드 ==============
+# 거래 하나를 __slots__ 객체로 보관한다 (dict보다 작고 속성 접근이 빠름).
+#   - 종류/방식/단위 문자열은 intern해서 모든 거래가 같은 문자열 객체를 공유
+#   - 시각(timestamp, expires_at)은 정수 epoch 초
+#   - 표시용 문자열(amount_formatted)은 저장하지 않고 필요할 때 만듦
+#
+# 디스크 형식 (FORMAT 2): 거래 하나를 FIELDS 순서의 배열(row)로 저장하고,
+# 종류/방식/단위는 TRADE_TYPES/METHODS/UNITS의 번호로 바꾼다 (목록에 없는 값은 문자열 그대로).
+# 끝쪽의 expires_at/expiry_noticed는 값이 없으면 생략한다.
+# 구버전(FORMAT 1 이하)의 dict 거래도 decode_trade로 그대로 읽는다.
+
+FORMAT = 2
+
+TRADE_TYPES = ("판매", "구매")
+METHODS = ("라이트닝", "온체인")
+UNITS = ("sats", "원")
+
+FIELDS = (
+    "id", "guild_id", "user_id", "user_name", "trade_type", "method", "unit",
+    "amount", "premium", "note", "timestamp", "expires_at", "expiry_noticed",
+)
+_TYPE_CODES = {value: code for code, value in enumerate(TRADE_TYPES)}
+_METHOD_CODES = {value: code for code, value in enumerate(METHODS)}
+_UNIT_CODES = {value: code for code, value in enumerate(UNITS)}
+
+
+def _decode_enum(values, value):
+    return values[value] if type(value) is int else sys.intern(value)
+
+
+def _epoch(value):
+    """구버전 ISO 문자열 시각을 정수 epoch 초로"""
+    if value is None or isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value)
+    return int(datetime.fromisoformat(value).timestamp())
+
+
+def _coerce(key, value):
+    """dict 필드를 Trade 속성 값으로 변환. 저장하지 않는 필드(amount_formatted 등)는 key None"""
+    if key in ("trade_type", "method", "unit"):
+        return key, sys.intern(value)
+    if key in ("timestamp", "expires_at"):
+        return key, _epoch(value)
+    if key == "expiry_noticed":
+        return key, bool(value)
+    if key in Trade.__slots__:
+        return key, value
+    return None, None
+
+
+class Trade:
+    __slots__ = FIELDS
+
+    def __init__(self, guild_id, user_id, user_name, trade_type, method, unit, amount, premium,
+                 note="", timestamp=None, expires_at=None, expiry_noticed=False, id=None):
+        self.id = id
+        self.guild_id = guild_id
+        self.user_id = user_id
+        self.user_name = user_name
+        self.trade_type = sys.intern(trade_type)
+        self.method = sys.intern(method)
+        self.unit = sys.intern(unit)
+        self.amount = amount
+        self.premium = premium
+        self.note = note
+        self.timestamp = int(time.time()) if timestamp is None else timestamp
+        self.expires_at = expires_at
+        self.expiry_noticed = expiry_noticed
+
+    def __repr__(self):
+        return f"<Trade #{self.id} {self.trade_type} {self.method} {self.amount_formatted} {self.premium:+}%>"
+
+    @property
+    def amount_formatted(self):
+        return f"{self.amount:,} {self.unit}"
+
+    def update(self, fields):
+        for key, value in fields.items():
+            key, value = _coerce(key, value)
+            if key is not None:
+                setattr(self, key, value)
+
+    # ---------- 변환 ----------
+    def to_dict(self):
+        """JSON 객체 형태 (SQLite data 열). 값이 없는 필드는 생략"""
+        data = {}
+        for key in FIELDS:
+            value = getattr(self, key)
+            if value is not None:
+                data[key] = value
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """구버전 dict 거래도 읽음 (ISO 시각, amount_formatted, unit 없음)"""
+        trade = cls.__new__(cls)
+        for key in FIELDS:
+            setattr(trade, key, None)
+        trade.unit = "sats"
+        trade.note = ""
+        trade.expiry_noticed = False
+        trade.update(data)
+        return trade
+
+    def to_row(self):
+        row = [
+            self.id, self.guild_id, self.user_id, self.user_name,
+            _TYPE_CODES.get(self.trade_type, self.trade_type),
+            _METHOD_CODES.get(self.method, self.method),
+            _UNIT_CODES.get(self.unit, self.unit),
+            self.amount, self.premium, self.note, self.timestamp,
+        ]
+        if self.expiry_noticed:
+            row += (self.expires_at, 1)
+        elif self.expires_at is not None:
+            row.append(self.expires_at)
+        return row
+
+    @classmethod
+    def from_row(cls, row):
+        trade = cls.__new__(cls)
+        (trade.id, trade.guild_id, trade.user_id, trade.user_name, trade_type, method, unit,
+         trade.amount, trade.premium, trade.note, trade.timestamp) = row[:11]
+        trade.trade_type = _decode_enum(TRADE_TYPES, trade_type)
+        trade.method = _decode_enum(METHODS, method)
+        trade.unit = _decode_enum(UNITS, unit)
+        trade.expires_at = row[11] if len(row) > 11 else None
+        trade.expiry_noticed = len(row) > 12 and bool(row[12])
+        return trade
+
+
+def decode_trade(value):
+    """스냅샷/로그에 저장된 거래 (FORMAT 2 row 또는 구버전 dict)"""
+    return Trade.from_row(value) if isinstance(value, list) else Trade.from_dict(value)
@@ -0,0 +1,112 @@
+import math
+import re
+from collections import namedtuple
+
+# ============== 입력 검증 ==============
+# 정규식은 모듈 로드 시 한 번만 컴파일하고, 메모 정제는 멘션/@everyone/@here/연속 줄바꿈을
+# 하나의 패턴으로 한 번에 처리한다. 오류 목록은 실제로 오류가 있을 때만 만든다.
+
+AMOUNT_LIMITS = {
+    "sats": {"min": 1_000, "max": 100_000_000, "display": "1,000 ~ 100,000,000 sats"},
+    "won": {"min": 1_000, "max": 100_000_000, "display": "1,000 ~ 100,000,000 원"}
+}
+PREMIUM_MIN = -50.0
+PREMIUM_MAX = 100.0
+NOTE_MAX_LENGTH = 200
+
+_NOTE_PATTERN = re.compile(r'@(everyone|here)|<(@[!&]?\d+|#\d+)>|\n{3,}')
+_NOTE_SPECIAL = frozenset("@<\n")
+_AMOUNT_STRIP = str.maketrans("", "", ", ")
+_PREMIUM_STRIP = str.maketrans("", "", "% ")
+
+ValidationResult = namedtuple("ValidationResult", "ok amount premium note errors")
+
+
+def _note_repl(match):
+    if match.group(1) is not None:
+        return "@\u200b" + match.group(1)
+    if match.group(2) is not None:
+        return f"`{match.group(2)}`"
+    return "\n\n"
+
+
+def sanitize_note(raw: str) -> str:
+    """메모 필드 정제: 마크다운/멘션 무효화"""
+    if not raw:
+        return ""
+    text = raw.strip()
+    if not text:
+        return ""
+    if not _NOTE_SPECIAL.isdisjoint(text):
+        text = _NOTE_PATTERN.sub(_note_repl, text)
+    if "```" in text:
+        text = text.replace("```", "\\`\\`\\`")
+    return text
+
+
+def check_trade_input(amount_raw: str, premium_raw: str, note_raw: str, unit: str) -> ValidationResult:
+    """거래 입력값 검증 (구조화된 결과)"""
+    errors = None
+
+    # 수량 검증
+    try:
+        amount_num = int(amount_raw.strip().translate(_AMOUNT_STRIP))
+    except (ValueError, OverflowError):
+        errors = ["• **수량**: 숫자만 입력해주세요. (예: 100000 또는 100,000)"]
+        amount_num = None
+
+    if amount_num is not None:
+        limits = AMOUNT_LIMITS.get(unit)
+        error = None
+        if limits is None:
+            error = f"• **단위**: 알 수 없는 단위입니다: {unit}"
+        elif amount_num <= 0:
+            error = "• **수량**: 수량은 양수여야 합니다."
+        elif amount_num < limits["min"]:
+            error = f"• **수량**: 최소 수량은 {limits['display']}입니다."
+        elif amount_num > limits["max"]:
+            error = f"• **수량**: 최대 수량은 {limits['display']}입니다."
+        if error is not None:
+            errors = [error]
+
+    # 프리미엄 검증
+    try:
+        premium_num = float(premium_raw.strip().translate(_PREMIUM_STRIP))
+    except (ValueError, OverflowError):
+        premium_num = None
+        error = "• **프리미엄**: 숫자만 입력해주세요. (예: 5 또는 -3.5)"
+    else:
+        error = None
+        if math.isinf(premium_num) or math.isnan(premium_num):
+            error = "• **프리미엄**: 유효한 숫자를 입력해주세요."
+        elif premium_num < PREMIUM_MIN:
+            error = f"• **프리미엄**: 프리미엄은 {PREMIUM_MIN}% 이상이어야 합니다."
+        elif premium_num > PREMIUM_MAX:
+            error = f"• **프리미엄**: 프리미엄은 {PREMIUM_MAX}% 이하여야 합니다."
+    if error is not None:
+        errors = errors or []
+        errors.append(error)
+
+    # 메모 정제
+    note_clean = sanitize_note(note_raw)
+    if len(note_clean) > NOTE_MAX_LENGTH:
+        errors = errors or []
+        errors.append(f"• **메모**: 메모는 {NOTE_MAX_LENGTH}자 이하로 입력해주세요. (현재: {len(note_clean)}자)")
+
+    if errors:
+        return ValidationResult(False, None, None, note_clean, errors)
+    return ValidationResult(True, amount_num, round(premium_num, 2), note_clean, ())
+
+
+def validate_trade_input(amount_raw: str, premium_raw: str, note_raw: str, unit: str):
+    """거래 입력값 검증: ((수량, 프리미엄, 메모), None) 또는 (None, 오류 메시지)"""
+    result = check_trade_input(amount_raw, premium_raw, note_raw, unit)
+    if not result.ok:
+        return None, "❌ 입력값을 확인해주세요:\n" + "\n".join(result.errors)
+    return (result.amount, result.premium, result.note), None
+
+
+def validate_many(items):
+    """(수량, 프리미엄, 메모, 단위) 튜플 여러 개를 한 번에 검증해서 ValidationResult 목록으로 반환"""
+    check = check_trade_input
+    return [check(amount_raw, premium_raw, note_raw, unit) for amount_raw, premium_raw, note_raw, unit in items]